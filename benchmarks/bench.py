@@ -0,0 +1,350 @@
+"""
+Micro-benchmarks for the transaction library.
+
+Run from the repository root:
+
+    python -m benchmarks.bench -o results.json
+    python -m benchmarks.bench -c results.json
+
+Every case runs on synthetic data of increasing size and is timed with
+``timeit``; the best of ``-r`` rounds is reported per call. The
+``startup.*`` cases time new interpreters running ``wallet.py``. With
+``-c`` the run is compared to a previous one and the exit status is 1 when a
+case got slower than ``--threshold``.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+
+from fastecdsa import keys
+
+from upow_transactions.constants import CURVE, MAX_INPUTS
+from upow_transactions.helpers import (
+    address_cache,
+    point_to_string,
+    string_to_point,
+)
+from upow_transactions.transaction import Transaction
+from upow_transactions.transaction_input import TransactionInput
+from upow_transactions.transaction_output import TransactionOutput
+from utils.coin_selection import STRATEGIES
+from utils.repository import WalletRepository
+from utils.utils import Utils
+
+INPUT_SIZES = [1, 16, 64, MAX_INPUTS]
+UTXO_SIZES = [10, 1_000, 10_000, 100_000]
+ADDRESS_SIZES = [10, 1_000]
+QUICK_UTXO_SIZES = [10, 1_000]
+
+PRIVATE_KEY = int(hashlib.sha256(b"benchmark").hexdigest(), 16) % CURVE.q
+PUBLIC_KEY = keys.get_public_key(PRIVATE_KEY, CURVE)
+ADDRESS = point_to_string(PUBLIC_KEY)
+
+
+def _tx_hash(i: int) -> str:
+    return hashlib.sha256(i.to_bytes(8, "little")).hexdigest()
+
+
+def _addresses(count: int):
+    return [
+        point_to_string(keys.get_public_key(private_key, CURVE))
+        for private_key in range(1, count + 1)
+    ]
+
+
+def _outputs_json(count: int, start: int = 0):
+    return [
+        {"tx_hash": _tx_hash(i), "index": i % 4, "amount": 1 + (i % 97) / 8}
+        for i in range(start, start + count)
+    ]
+
+
+def _address_info(count: int):
+    # Every category uses its own outputs, a tenth of which is pending spent
+    categories = [
+        "spendable_outputs",
+        "stake_outputs",
+        "inode_registration_outputs",
+        "delegate_spent_votes",
+        "delegate_unspent_votes",
+        "validator_unspent_votes",
+    ]
+    result = {
+        category: _outputs_json(count, start=n * count)
+        for n, category in enumerate(categories)
+    }
+    result.update(
+        balance=0,
+        stake=0,
+        pending_spent_outputs=[
+            output for category in categories for output in result[category][::10]
+        ],
+        pending_transactions=[],
+    )
+    return result
+
+
+def _transaction(inputs_count: int) -> Transaction:
+    inputs = [
+        TransactionInput(_tx_hash(i), i % 4, public_key=PUBLIC_KEY, value=100_000_000)
+        for i in range(inputs_count)
+    ]
+    outputs = [TransactionOutput.from_value(ADDRESS, inputs_count * 100_000_000)]
+    return Transaction(inputs, outputs)
+
+
+class _Uncached:
+    """
+    Disables the address conversion cache while the case runs.
+    """
+
+    def __enter__(self):
+        self.maxsize = address_cache.maxsize
+        address_cache.maxsize = 0
+        address_cache.clear()
+
+    def __exit__(self, *exc_info):
+        address_cache.maxsize = self.maxsize
+
+
+def transaction_cases(sizes):
+    loop = asyncio.new_event_loop()
+    for size in sizes:
+        transaction = _transaction(size).sign([PRIVATE_KEY])
+        tx_hex = transaction.hex()
+        yield "transaction.hex", size, transaction.hex
+        yield "transaction.build_and_hex", size, (
+            lambda size=size: _transaction(size).hex(False)
+        )
+        yield "transaction.sign", size, (
+            lambda size=size: _transaction(size).sign([PRIVATE_KEY])
+        )
+        yield "transaction.from_hex", size, (
+            lambda tx_hex=tx_hex: loop.run_until_complete(
+                Transaction.from_hex(tx_hex, check_signatures=False)
+            )
+        )
+
+
+def output_cases(sizes):
+    for size in sizes:
+        addresses = _addresses(size)
+
+        def construct(addresses=addresses):
+            return [TransactionOutput(address, 1) for address in addresses]
+
+        yield "transaction_output.init", size, construct
+        yield "transaction_output.init_uncached", size, construct, _Uncached
+
+
+def address_cases(sizes):
+    for size in sizes:
+        addresses = _addresses(size)
+        points = [string_to_point(address) for address in addresses]
+
+        def to_point(addresses=addresses):
+            return [string_to_point(address) for address in addresses]
+
+        def to_string(points=points):
+            return [point_to_string(point) for point in points]
+
+        yield "helpers.string_to_point", size, to_point
+        yield "helpers.string_to_point_uncached", size, to_point, _Uncached
+        yield "helpers.point_to_string", size, to_string
+        yield "helpers.point_to_string_uncached", size, to_string, _Uncached
+
+
+def selection_cases(sizes):
+    wallet_utils = Utils()
+    for size in sizes:
+        inputs = wallet_utils.repo.get_address_input_from_json(
+            _address_info(size), ADDRESS
+        )
+        # About half of the balance, capped to what MAX_INPUTS inputs can cover,
+        # so no strategy gets away with a single input
+        values = sorted(tx_input.value for tx_input in inputs)
+        amount = min(sum(values) // 2, sum(values[-MAX_INPUTS:]))
+        for strategy in STRATEGIES:
+            yield f"utils.select_transaction_input[{strategy}]", size, (
+                lambda inputs=inputs, amount=amount, strategy=strategy: (
+                    wallet_utils.select_transaction_input(inputs, amount, strategy)
+                )
+            )
+
+
+def repository_cases(sizes):
+    repo = WalletRepository(Utils.NODE_URL)
+    for size in sizes:
+        result = _address_info(size)
+        yield "repository.get_address_input_from_json", size, (
+            lambda result=result: repo.get_address_input_from_json(result, ADDRESS)
+        )
+        yield "repository.get_address_utxo_table_from_json", size, (
+            lambda result=result: repo.get_address_utxo_table_from_json(result, ADDRESS)
+        )
+        yield "repository.get_stake_input_from_json", size, (
+            lambda result=result: repo.get_stake_input_from_json(result, ADDRESS)
+        )
+        yield "repository.get_inode_registration_input_from_json", size, (
+            lambda result=result: repo.get_inode_registration_input_from_json(
+                result, ADDRESS
+            )
+        )
+        yield "repository.get_delegate_spent_votes_from_json", size, (
+            lambda result=result: repo.get_delegate_spent_votes_from_json(result)
+        )
+        yield "repository.get_delegate_unspent_votes_from_json", size, (
+            lambda result=result: repo.get_delegate_unspent_votes_from_json(
+                result, ADDRESS
+            )
+        )
+        yield "repository.get_validator_unspent_votes_from_json", size, (
+            lambda result=result: repo.get_validator_unspent_votes_from_json(
+                result, ADDRESS
+            )
+        )
+
+
+def startup_cases():
+    """
+    Start-up time of fresh interpreters, which is what a shell script or cron
+    job pays on every wallet call.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    wallet = os.path.join(root, "wallet.py")
+    commands = [
+        ("startup.python", [sys.executable, "-c", "pass"]),
+        ("startup.wallet_help", [sys.executable, wallet, "--help"]),
+        ("startup.wallet_invalid_command", [sys.executable, wallet, "invalid"]),
+        ("startup.import_utils", [sys.executable, "-c", "import utils.utils"]),
+    ]
+    for name, command in commands:
+        yield name, 1, (
+            lambda command=command: subprocess.run(
+                command, cwd=root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+        )
+
+
+def run_case(function, repeat: int):
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    timings = timer.repeat(repeat=repeat, number=number)
+    return {
+        "number": number,
+        "best": min(timings) / number,
+        "mean": sum(timings) / len(timings) / number,
+    }
+
+
+def run(quick: bool = False, repeat: int = 5, match: str = None):
+    utxo_sizes = QUICK_UTXO_SIZES if quick else UTXO_SIZES
+    input_sizes = INPUT_SIZES[:2] if quick else INPUT_SIZES
+    suites = [
+        transaction_cases(input_sizes),
+        output_cases(ADDRESS_SIZES),
+        address_cases(ADDRESS_SIZES),
+        selection_cases(utxo_sizes),
+        repository_cases(utxo_sizes),
+        startup_cases(),
+    ]
+    results = []
+    for suite in suites:
+        for name, size, function, *context in suite:
+            if match and match not in name:
+                continue
+            if context:
+                with context[0]():
+                    result = run_case(function, repeat)
+            else:
+                result = run_case(function, repeat)
+            result = {"name": name, "size": size, **result}
+            print(
+                f"{name:<50} {size:>7} {result['best'] * 1e6:>14.2f} us",
+                file=sys.stderr,
+            )
+            results.append(result)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path: str, threshold: float):
+    """
+    Prints the change against a previous run and returns the cases that got
+    slower by more than ``threshold``.
+    """
+    with open(baseline_path) as file:
+        baseline = {
+            (result["name"], result["size"]): result
+            for result in json.load(file)["results"]
+        }
+    regressions = []
+    for result in results:
+        previous = baseline.get((result["name"], result["size"]))
+        if previous is None:
+            continue
+        ratio = result["best"] / previous["best"]
+        print(f"{result['name']:<50} {result['size']:>7} {ratio:>8.2f}x")
+        if ratio > 1 + threshold:
+            regressions.append(result)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transaction library benchmarks")
+    parser.add_argument("-o", metavar="output", type=str, dest="output")
+    parser.add_argument(
+        "-c", metavar="baseline", type=str, dest="baseline", help="compare to a run"
+    )
+    parser.add_argument(
+        "-k", metavar="match", type=str, dest="match", help="only run matching cases"
+    )
+    parser.add_argument("-r", metavar="repeat", type=int, dest="repeat", default=5)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="slowdown reported as regression when comparing",
+    )
+    parser.add_argument("--quick", action="store_true", help="only small datasets")
+    args = parser.parse_args()
+
+    results = run(args.quick, args.repeat, args.match)
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": int(time.time()),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline and compare(results, args.baseline, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
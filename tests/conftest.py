@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+from fastecdsa import keys
+
+from upow_transactions.constants import CURVE
+from upow_transactions.helpers import point_to_string
+from utils.local_node import LocalNode
+from utils.mempool import Mempool
+from utils.utils import Utils
+from utils.utxo_store import UTXOStore
+
+PRIVATE_KEY = 0x1234567890ABCDEF1234567890ABCDEF1234567890ABCDEF1234567890ABCDEF
+ADDRESS = point_to_string(keys.get_public_key(PRIVATE_KEY, CURVE))
+OTHER_ADDRESS = point_to_string(keys.get_public_key(PRIVATE_KEY + 1, CURVE))
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@pytest.fixture
+def node():
+    return LocalNode.synthetic([ADDRESS], 3, "20")
+
+
+@pytest.fixture
+def wallet(node):
+    return Utils(node, UTXOStore(":memory:", max_age=0), mempool=Mempool())
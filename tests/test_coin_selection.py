@@ -0,0 +1,51 @@
+import pytest
+
+from upow_transactions.constants import MAX_INPUTS
+from upow_transactions.helpers import to_smallest
+from upow_transactions.transaction_input import TransactionInput
+from utils.coin_selection import InsufficientInputsError, select_inputs
+
+
+def make_inputs(amounts):
+    return [
+        TransactionInput(f"{index:064x}", 0, value=to_smallest(amount))
+        for index, amount in enumerate(amounts)
+    ]
+
+
+def total(inputs):
+    return sum(tx_input.value for tx_input in inputs)
+
+
+def test_branch_and_bound_finds_exact_match():
+    inputs = make_inputs(["5", "3", "2.5", "1.5", "0.7"])
+    selected = select_inputs(inputs, to_smallest("3.2"), "branch_and_bound")
+    assert total(selected) == to_smallest("3.2")
+
+
+def test_branch_and_bound_falls_back_without_exact_match():
+    inputs = make_inputs(["5", "3", "2"])
+    selected = select_inputs(inputs, to_smallest("4"), "branch_and_bound")
+    assert [tx_input.value for tx_input in selected] == [to_smallest("5")]
+
+
+def test_fewest_inputs_picks_smallest_covering_input():
+    inputs = make_inputs(["10", "4", "6"])
+    selected = select_inputs(inputs, to_smallest("5"), "fewest_inputs")
+    assert [tx_input.value for tx_input in selected] == [to_smallest("6")]
+
+
+@pytest.mark.parametrize(
+    "strategy", ["branch_and_bound", "largest_first", "fewest_inputs"]
+)
+def test_selection_is_capped_at_max_inputs(strategy):
+    inputs = make_inputs(["1"] * (MAX_INPUTS + 10))
+    selected = select_inputs(inputs, to_smallest(MAX_INPUTS), strategy)
+    assert len(selected) == MAX_INPUTS
+    with pytest.raises(InsufficientInputsError):
+        select_inputs(inputs, to_smallest(MAX_INPUTS + 1), strategy)
+
+
+def test_unknown_strategy():
+    with pytest.raises(Exception, match="Unknown coin selection strategy"):
+        select_inputs(make_inputs(["1"]), 1, "random")
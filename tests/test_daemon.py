@@ -0,0 +1,57 @@
+import json
+import os
+
+import pytest
+
+from utils.daemon import INVALID_REQUEST, UNAUTHORIZED, WalletDaemon, load_token
+from utils.keystore import KeyStore
+from tests.conftest import ADDRESS, OTHER_ADDRESS, PRIVATE_KEY, run
+
+
+@pytest.fixture
+def daemon(wallet, tmp_path):
+    keystore = KeyStore(str(tmp_path / "wallet.db"))
+    keystore.add_key(PRIVATE_KEY)
+    return WalletDaemon(wallet, keystore)
+
+
+def request(method, params=None, **members):
+    return json.dumps(
+        {"jsonrpc": "2.0", "id": 1, "method": method, "params": params, **members}
+    ).encode()
+
+
+def test_token_is_required(daemon):
+    for line in (
+        request("balance"),
+        request("balance", token="wrong"),
+        request("send", {"to": OTHER_ADDRESS, "amount": "1"}, token="wrong"),
+    ):
+        response = run(daemon.handle_line(line, "secret"))
+        assert response["error"]["code"] == UNAUTHORIZED
+
+
+def test_valid_token_is_accepted(daemon):
+    response = run(daemon.handle_line(request("balance", token="secret"), "secret"))
+    assert response["result"][0]["address"] == ADDRESS
+
+
+def test_send_without_token_check(daemon, node):
+    response = run(
+        daemon.handle_line(request("send", {"to": OTHER_ADDRESS, "amount": "1"}))
+    )
+    assert response["result"]["ok"]
+    assert node.pushed_transactions == [response["result"]["tx_hash"]]
+
+
+def test_invalid_request(daemon):
+    response = run(daemon.handle_line(b"[1, 2]"))
+    assert response["error"]["code"] == INVALID_REQUEST
+
+
+def test_load_token_creates_private_file(tmp_path):
+    path = str(tmp_path / "token")
+    token = load_token(path)
+    assert len(token) == 64
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    assert load_token(path) == token
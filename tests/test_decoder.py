@@ -0,0 +1,39 @@
+import pytest
+
+from upow_transactions.decoder import decode_transaction
+from upow_transactions.helpers import is_on_curve
+from upow_transactions.transaction import Transaction
+from tests.conftest import ADDRESS, OTHER_ADDRESS, PRIVATE_KEY, run
+
+
+def test_decode_round_trip(wallet):
+    transaction = run(
+        wallet.create_transaction(PRIVATE_KEY, OTHER_ADDRESS, "1.5", b"hello")
+    )
+    decoded = decode_transaction(bytes.fromhex(transaction.hex()))
+    assert decoded.hash() == transaction.hash()
+    assert [(tx_input.tx_hash, tx_input.index) for tx_input in decoded.inputs] == [
+        (tx_input.tx_hash, tx_input.index) for tx_input in transaction.inputs
+    ]
+    assert [tx_output.address for tx_output in decoded.outputs] == [
+        OTHER_ADDRESS,
+        ADDRESS,
+    ]
+    rebuilt = run(decoded.to_transaction())
+    assert rebuilt.hex() == transaction.hex()
+    assert run(Transaction.from_hex(transaction.hex())).hash() == transaction.hash()
+
+
+def test_decode_rejects_off_curve_address(wallet):
+    transaction = run(wallet.create_transaction(PRIVATE_KEY, OTHER_ADDRESS, "1"))
+    data = bytearray(transaction.tobytes())
+    address = transaction.outputs[0].address_bytes
+    start = data.index(address)
+    off_curve = next(
+        candidate
+        for candidate in (address[:-1] + bytes([value]) for value in range(256))
+        if not is_on_curve(candidate)
+    )
+    data[start : start + len(address)] = off_curve
+    with pytest.raises(Exception, match="not a point of the curve"):
+        decode_transaction(bytes(data))
@@ -0,0 +1,73 @@
+from utils.mempool import Mempool
+from utils.utils import Utils
+from utils.utxo_store import UTXOStore
+from tests.conftest import ADDRESS, OTHER_ADDRESS, PRIVATE_KEY, run
+
+
+def send_chain(wallet, count):
+    return [
+        run(wallet.create_transaction(PRIVATE_KEY, OTHER_ADDRESS, "1"))
+        for _ in range(count)
+    ]
+
+
+def test_change_is_spent_before_confirmation(wallet):
+    first, second, third = send_chain(wallet, 3)
+    assert second.inputs[0].tx_hash == first.hash()
+    assert third.inputs[0].tx_hash == second.hash()
+    mempool = wallet.repo.mempool
+    assert [mempool.depth(tx.hash()) for tx in (first, second, third)] == [1, 2, 3]
+
+
+def test_max_depth_stops_chaining(node):
+    wallet = Utils(node, UTXOStore(":memory:", max_age=0), mempool=Mempool(max_depth=2))
+    transactions = send_chain(wallet, 3)
+    # The change of the second transaction is at the maximum depth, so the
+    # third one spends a node output
+    assert transactions[1].inputs[0].tx_hash == transactions[0].hash()
+    assert transactions[2].inputs[0].tx_hash not in {tx.hash() for tx in transactions}
+
+
+def test_max_depth_zero_disables_chaining(node):
+    wallet = Utils(node, UTXOStore(":memory:", max_age=0), mempool=Mempool(max_depth=0))
+    transactions = send_chain(wallet, 3)
+    assert len({tx.inputs[0].tx_hash for tx in transactions}) == 3
+    assert not {tx.inputs[0].tx_hash for tx in transactions} & {
+        tx.hash() for tx in transactions
+    }
+
+
+def test_remove_drops_descendants(wallet):
+    first, second, third = send_chain(wallet, 3)
+    mempool = wallet.repo.mempool
+    mempool.remove(second.hash())
+    assert mempool.has(first.hash())
+    assert not mempool.has(second.hash())
+    assert not mempool.has(third.hash())
+
+
+def test_confirm_drops_ancestors(wallet):
+    first, second, third = send_chain(wallet, 3)
+    mempool = wallet.repo.mempool
+    mempool.confirm(second.hash())
+    assert not mempool.has(first.hash())
+    assert not mempool.has(second.hash())
+    assert mempool.has(third.hash())
+    assert mempool.depth(third.hash()) == 1
+
+
+def test_reported_output_confirms(wallet, node):
+    first, second = send_chain(wallet, 2)
+    assert run(wallet.push_tx(first))["ok"]
+    run(wallet.repo.get_address_info(ADDRESS))
+    mempool = wallet.repo.mempool
+    assert not mempool.has(first.hash())
+    assert mempool.has(second.hash())
+
+
+def test_expired_transactions_are_dropped(wallet):
+    (transaction,) = send_chain(wallet, 1)
+    mempool = wallet.repo.mempool
+    mempool.ttl = -1
+    mempool.merge(ADDRESS, {"spendable_outputs": []})
+    assert not mempool.has(transaction.hash())
@@ -0,0 +1,155 @@
+import pytest
+import requests
+
+from utils.push_pipeline import PushPipeline, is_transient
+from tests.conftest import OTHER_ADDRESS, PRIVATE_KEY, run
+
+
+class FlakyNode:
+    """
+    Forwards to ``node``, failing the first ``failures`` pushes with ``error``.
+    With ``deliver``, the failed pushes still reach the node, like a timeout
+    on the response.
+    """
+
+    def __init__(self, node, failures: int, error: Exception, deliver: bool = False):
+        self.node = node
+        self.failures = failures
+        self.error = error
+        self.deliver = deliver
+        self.pushes = 0
+
+    async def get(self, path, params=None, timeout=None):
+        return await self.node.get(path, params, timeout)
+
+    async def post(self, path, json=None, timeout=None):
+        self.pushes += 1
+        if self.failures:
+            self.failures -= 1
+            if self.deliver:
+                await self.node.post(path, json, timeout)
+            raise self.error
+        return await self.node.post(path, json, timeout)
+
+
+def http_error(status: int):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(str(status), response=response)
+
+
+def send_chain(wallet, count):
+    return [
+        run(wallet.create_transaction(PRIVATE_KEY, OTHER_ADDRESS, "1"))
+        for _ in range(count)
+    ]
+
+
+def pipeline(wallet, **kwargs):
+    return PushPipeline(wallet.repo, base_delay=0.001, **kwargs)
+
+
+@pytest.mark.parametrize(
+    "error, transient",
+    [
+        (requests.ConnectionError("down"), True),
+        (requests.Timeout("slow"), True),
+        (http_error(503), True),
+        (http_error(429), True),
+        (http_error(400), False),
+        (requests.exceptions.InvalidURL("bad"), False),
+        (OSError("disk"), False),
+    ],
+)
+def test_is_transient(error, transient):
+    assert is_transient(error) == transient
+
+
+def test_chain_is_pushed_in_order(wallet, node):
+    transactions = send_chain(wallet, 3)
+    results = run(pipeline(wallet, max_in_flight=1).push_all(transactions))
+    assert all(result.ok for result in results)
+    assert node.pushed_transactions == [tx.hash() for tx in transactions]
+
+
+def test_transient_errors_are_retried(wallet, node):
+    transactions = send_chain(wallet, 2)
+    wallet.repo.transport = FlakyNode(node, 2, requests.ConnectionError("down"))
+    results = run(pipeline(wallet, max_in_flight=1).push_all(transactions))
+    assert [(result.ok, result.attempts) for result in results] == [
+        (True, 3),
+        (True, 1),
+    ]
+    assert all(wallet.repo.mempool.has(tx.hash()) for tx in transactions)
+
+
+def test_already_known_after_timeout_counts_as_pushed(wallet, node):
+    transactions = send_chain(wallet, 2)
+    wallet.repo.transport = FlakyNode(node, 1, requests.Timeout("slow"), deliver=True)
+    results = run(pipeline(wallet, max_in_flight=1).push_all(transactions))
+    assert [(result.ok, result.attempts) for result in results] == [
+        (True, 2),
+        (True, 1),
+    ]
+    assert node.pushed_transactions == [tx.hash() for tx in transactions]
+    assert all(wallet.repo.mempool.has(tx.hash()) for tx in transactions)
+
+
+def test_exhausted_retries_keep_records(wallet, node):
+    transactions = send_chain(wallet, 2)
+    wallet.repo.transport = FlakyNode(node, 100, requests.ConnectionError("down"))
+    results = run(pipeline(wallet, max_attempts=2).push_all(transactions))
+    assert [(result.ok, result.attempts) for result in results] == [
+        (False, 2),
+        (False, 2),
+    ]
+    assert all(wallet.repo.mempool.has(tx.hash()) for tx in transactions)
+
+
+def test_rejection_is_not_retried_and_forgets(wallet, node):
+    transactions = send_chain(wallet, 2)
+    transport = FlakyNode(node, 100, http_error(400))
+    wallet.repo.transport = transport
+    results = run(pipeline(wallet, max_in_flight=1).push_all(transactions[:1]))
+    assert [(result.ok, result.attempts) for result in results] == [(False, 1)]
+    assert transport.pushes == 1
+    # The descendants go with it
+    assert not any(wallet.repo.mempool.has(tx.hash()) for tx in transactions)
+
+
+def test_node_rejection_forgets(wallet, node):
+    (transaction,) = send_chain(wallet, 1)
+    node.outputs.clear()
+    node.owners.clear()
+    (result,) = run(pipeline(wallet).push_all([transaction]))
+    assert not result.ok
+    assert "Unknown or spent inputs" in result.error
+    assert not wallet.repo.mempool.has(transaction.hash())
+
+
+@pytest.mark.parametrize(
+    "error",
+    [requests.Timeout("slow"), requests.ConnectionError("down"), http_error(500)],
+)
+def test_push_tx_keeps_records_on_unknown_outcome(wallet, node, error):
+    (transaction,) = send_chain(wallet, 1)
+    wallet.repo.transport = FlakyNode(node, 1, error)
+    with pytest.raises(type(error)):
+        run(wallet.push_tx(transaction))
+    assert wallet.repo.mempool.has(transaction.hash())
+
+
+def test_push_tx_forgets_on_http_rejection(wallet, node):
+    (transaction,) = send_chain(wallet, 1)
+    wallet.repo.transport = FlakyNode(node, 1, http_error(400))
+    with pytest.raises(requests.HTTPError):
+        run(wallet.push_tx(transaction))
+    assert not wallet.repo.mempool.has(transaction.hash())
+
+
+def test_push_tx_keeps_records_when_already_known(wallet, node):
+    (transaction,) = send_chain(wallet, 1)
+    assert run(wallet.push_tx(transaction))["ok"]
+    response = run(wallet.push_tx(transaction))
+    assert not response["ok"]
+    assert wallet.repo.mempool.has(transaction.hash())
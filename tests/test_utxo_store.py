@@ -0,0 +1,55 @@
+import time
+
+from tests.conftest import ADDRESS, OTHER_ADDRESS, PRIVATE_KEY, run
+
+
+def pending_spent(wallet):
+    result = run(wallet.repo.get_address_info(ADDRESS))
+    return {
+        (output["tx_hash"], output["index"])
+        for output in result["pending_spent_outputs"]
+    }
+
+
+def spent(transaction):
+    return {(tx_input.tx_hash, tx_input.index) for tx_input in transaction.inputs}
+
+
+def test_signed_inputs_are_pending_spent(wallet):
+    transaction = run(wallet.create_transaction(PRIVATE_KEY, OTHER_ADDRESS, "25"))
+    assert spent(transaction) <= pending_spent(wallet)
+
+
+def test_spend_unknown_to_node_is_cleared_after_grace(wallet):
+    transaction = run(wallet.create_transaction(PRIVATE_KEY, OTHER_ADDRESS, "25"))
+    wallet.repo.utxo_store.spent_grace = 0
+    time.sleep(0.01)
+    assert not spent(transaction) & pending_spent(wallet)
+
+
+def test_spend_is_cleared_after_ttl(wallet):
+    transaction = run(wallet.create_transaction(PRIVATE_KEY, OTHER_ADDRESS, "25"))
+    wallet.repo.utxo_store.spent_ttl = 0
+    time.sleep(0.01)
+    assert not spent(transaction) & pending_spent(wallet)
+
+
+def test_spend_listed_by_node_is_kept_after_grace(wallet):
+    transaction = run(wallet.create_transaction(PRIVATE_KEY, OTHER_ADDRESS, "25"))
+    store = wallet.repo.utxo_store
+    store.spent_grace = 0
+    time.sleep(0.01)
+    result = {
+        "spendable_outputs": [
+            {"tx_hash": tx_hash, "index": index, "amount": "20"}
+            for tx_hash, index in spent(transaction)
+        ],
+        "pending_spent_outputs": [
+            {"tx_hash": tx_hash, "index": index}
+            for tx_hash, index in spent(transaction)
+        ],
+    }
+    store.refresh(ADDRESS, [], result)
+    assert store.connection.execute(
+        "SELECT COUNT(*) FROM outputs WHERE spent_at IS NOT NULL"
+    ).fetchone()[0] == len(transaction.inputs)
@@ -5,9 +5,10 @@ from .transaction_output import TransactionOutput
 
 
 class CoinbaseTransaction:
-    _hex: str = None
+    __slots__ = ("block_hash", "address", "amount", "outputs", "_hex")
 
     def __init__(self, block_hash: str, address: str, amount: Decimal):
+        self._hex: str = None
         self.block_hash = block_hash
         self.address = address
         self.amount = amount
@@ -7,3 +7,5 @@ MAX_SUPPLY = 18_884_643
 VERSION = 1
 MAX_BLOCK_SIZE_HEX = 4096 * 1024  # 4MB in HEX format, 2MB in raw bytes
 MAX_INODES = 12
+MAX_INPUTS = 255
+MAX_OUTPUTS = 255
@@ -0,0 +1,225 @@
+from typing import List, NamedTuple, Tuple, Union
+
+from .coinbase_transaction import CoinbaseTransaction
+from .constants import ENDIAN
+from .helpers import (
+    InputType,
+    OutputType,
+    bytes_to_string,
+    is_on_curve,
+    point_to_string,
+    sha256,
+)
+from .transaction_input import TransactionInput
+from .transaction_output import TransactionOutput
+
+
+class DecodedInput(NamedTuple):
+    tx_hash_bytes: bytes
+    index: int
+    input_type: int
+
+    @property
+    def tx_hash(self) -> str:
+        return self.tx_hash_bytes.hex()
+
+
+class DecodedOutput(NamedTuple):
+    address_bytes: bytes
+    amount: int
+    output_type: int
+
+    @property
+    def address(self) -> str:
+        return bytes_to_string(self.address_bytes)
+
+
+class DecodedTransaction:
+    """
+    Lightweight result of ``decode_transaction``.
+
+    Addresses are kept as raw bytes and amounts as integers in the smallest
+    unit. The hash, address strings and full transaction objects are only
+    computed when asked for.
+    """
+
+    __slots__ = (
+        "raw",
+        "version",
+        "inputs",
+        "outputs",
+        "message",
+        "signatures",
+        "is_coinbase",
+        "_hash",
+    )
+
+    def __init__(
+        self,
+        raw: memoryview,
+        version: int,
+        inputs: List[DecodedInput],
+        outputs: List[DecodedOutput],
+        message: bytes,
+        signatures: List[Tuple[int, int]],
+        is_coinbase: bool,
+    ):
+        self.raw = raw
+        self.version = version
+        self.inputs = inputs
+        self.outputs = outputs
+        self.message = message
+        self.signatures = signatures
+        self.is_coinbase = is_coinbase
+        self._hash = None
+
+    def hash(self) -> str:
+        if self._hash is None:
+            self._hash = sha256(self.raw)
+        return self._hash
+
+    async def to_transaction(self, check_signatures: bool = True):
+        from .transaction import Transaction
+
+        inputs = [
+            TransactionInput(
+                tx_input.tx_hash,
+                index=tx_input.index,
+                input_type=InputType(tx_input.input_type),
+            )
+            for tx_input in self.inputs
+        ]
+        outputs = [
+            TransactionOutput.from_address_bytes(
+                tx_output.address_bytes,
+                tx_output.amount,
+                OutputType(tx_output.output_type),
+            )
+            for tx_output in self.outputs
+        ]
+
+        if self.is_coinbase:
+            assert len(inputs) == 1
+            coinbase_transaction = CoinbaseTransaction(
+                inputs[0].tx_hash, outputs[0].address, outputs[0].amount
+            )
+            if len(outputs) > 1:
+                coinbase_transaction.outputs.extend(outputs[1:])
+            return coinbase_transaction
+
+        signatures = self.signatures
+        if len(signatures) == 1:
+            for tx_input in inputs:
+                tx_input.signed = signatures[0]
+        elif len(inputs) == len(signatures):
+            for tx_input, signed in zip(inputs, signatures):
+                tx_input.signed = signed
+        else:
+            if not check_signatures:
+                return Transaction(inputs, outputs, self.message, self.version)
+            index = {}
+            for tx_input in inputs:
+                public_key = point_to_string(await tx_input.get_public_key())
+                index.setdefault(public_key, []).append(tx_input)
+            if len(signatures) != len(index):
+                raise Exception(
+                    f"Expected {len(index)} signatures, one per key, not {len(signatures)}"
+                )
+
+            for signed, public_key_inputs in zip(signatures, index.values()):
+                for tx_input in public_key_inputs:
+                    tx_input.signed = signed
+
+        return Transaction(inputs, outputs, self.message, self.version)
+
+
+def decode_transaction(data: Union[bytes, bytearray, memoryview]) -> DecodedTransaction:
+    """
+    Decodes one serialized transaction by reading fields straight out of a
+    memoryview of ``data``, without copying the buffer.
+    """
+    view = memoryview(data)
+    size = len(view)
+    version = view[0]
+    if version > 3:
+        raise NotImplementedError()
+
+    inputs_count = view[1]
+    offset = 2
+    inputs = []
+    for _ in range(inputs_count):
+        inputs.append(
+            DecodedInput(
+                bytes(view[offset : offset + 32]), view[offset + 32], view[offset + 33]
+            )
+        )
+        offset += 34
+
+    outputs_count = view[offset]
+    offset += 1
+    address_length = 64 if version == 1 else 33
+    outputs = []
+    for _ in range(outputs_count):
+        address_bytes = bytes(view[offset : offset + address_length])
+        if not is_on_curve(address_bytes):
+            raise Exception(
+                f"Address {address_bytes.hex()} is not a point of the curve"
+            )
+        offset += address_length
+        amount_length = view[offset]
+        offset += 1
+        amount = int.from_bytes(view[offset : offset + amount_length], ENDIAN)
+        offset += amount_length
+        outputs.append(DecodedOutput(address_bytes, amount, view[offset]))
+        offset += 1
+
+    specifier = view[offset] if offset < size else 0
+    offset += 1
+    if specifier == 36:
+        return DecodedTransaction(view, version, inputs, outputs, None, [], True)
+
+    if specifier == 1:
+        length_size = 1 if version <= 2 else 2
+        message_length = int.from_bytes(view[offset : offset + length_size], ENDIAN)
+        offset += length_size
+        message = bytes(view[offset : offset + message_length])
+        offset += message_length
+    else:
+        message = None
+        assert specifier == 0
+
+    signatures = []
+    while offset < size:
+        r = int.from_bytes(view[offset : offset + 32], ENDIAN)
+        if r == 0:
+            break
+        signatures.append((r, int.from_bytes(view[offset + 32 : offset + 64], ENDIAN)))
+        offset += 64
+
+    return DecodedTransaction(
+        view, version, inputs, outputs, message, signatures, False
+    )
+
+
+def decode_transactions(transactions) -> List[DecodedTransaction]:
+    """
+    Decodes many transactions, given as hex strings or bytes, e.g. a block's
+    worth or a mempool dump.
+    """
+    return [
+        decode_transaction(
+            bytes.fromhex(transaction) if isinstance(transaction, str) else transaction
+        )
+        for transaction in transactions
+    ]
+
+
+async def decode_full_transactions(transactions, check_signatures: bool = True):
+    """
+    Same as ``decode_transactions`` but returns ``Transaction`` and
+    ``CoinbaseTransaction`` objects.
+    """
+    return [
+        await decoded.to_transaction(check_signatures)
+        for decoded in decode_transactions(transactions)
+    ]
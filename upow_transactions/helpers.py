@@ -1,7 +1,7 @@
 import hashlib
 import json
 import logging
-import sys
+from collections import OrderedDict
 from decimal import Decimal
 from enum import Enum, IntEnum
 from math import ceil
@@ -11,25 +11,44 @@ from typing import Union
 import base58
 from fastecdsa.point import Point
 from fastecdsa.util import mod_sqrt
-from icecream import ic
 
 from .constants import ENDIAN, CURVE, SMALLEST
 
 _print = print
 
-logging.basicConfig(level=logging.INFO if '--nologs' not in sys.argv else logging.WARNING)
-
 
 def log(s):
     logging.getLogger('upow').info(s)
 
 
-ic.configureOutput(outputFunction=log)
+_ic = None
+
+
+def ic(*args):
+    # icecream takes longer to import than the rest of the library, so it is
+    # only loaded for the first debug output
+    global _ic
+    if _ic is None:
+        from icecream import ic as _ic
+        _ic.configureOutput(outputFunction=log)
+    return _ic(*args)
+
+
+def _attributes(obj):
+    as_dict = getattr(obj, 'as_dict', None)
+    if as_dict is not None:
+        return as_dict
+    if hasattr(obj, '__dict__'):
+        return obj.__dict__
+    slots = [name for cls in type(obj).__mro__ for name in getattr(cls, '__slots__', ())]
+    if not slots:
+        return str(obj)
+    return {name: getattr(obj, name) for name in slots if not name.startswith('_') and hasattr(obj, name)}
 
 
 def get_json(obj):
     return json.loads(
-        json.dumps(obj, default=lambda o: getattr(o, 'as_dict', getattr(o, '__dict__', str(o))))
+        json.dumps(obj, default=_attributes)
     )
 
 
@@ -125,6 +144,62 @@ def simple_bytes_to_string(data: bytes) -> str:
         return data.hex()
 
 
+class AddressCache:
+    """
+    Bounded LRU cache shared by the conversions between address strings,
+    address bytes and points. Entries are keyed by conversion kind and input,
+    and hits and misses are counted per kind. ``maxsize=0`` disables caching.
+    """
+
+    def __init__(self, maxsize: int = 65536):
+        self.maxsize = maxsize
+        self.hits = {}
+        self.misses = {}
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def get(self, kind: str, key):
+        value = self._entries.get((kind, key))
+        if value is None:
+            self.misses[kind] = self.misses.get(kind, 0) + 1
+            return None
+        self.hits[kind] = self.hits.get(kind, 0) + 1
+        self._entries.move_to_end((kind, key))
+        return value
+
+    def put(self, kind: str, key, value):
+        if self.maxsize <= 0:
+            return
+        self._entries[(kind, key)] = value
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        return {
+            'hits': hits,
+            'misses': misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+            'kinds': {
+                kind: {'hits': self.hits.get(kind, 0), 'misses': self.misses.get(kind, 0)}
+                for kind in sorted(set(self.hits) | set(self.misses))
+            },
+        }
+
+    def clear(self):
+        self._entries.clear()
+        self.hits.clear()
+        self.misses.clear()
+        self.evictions = 0
+
+
+address_cache = AddressCache()
+
+
 def point_to_bytes(point: Point, address_format: AddressFormat = AddressFormat.FULL_HEX) -> bytes:
     if address_format is AddressFormat.FULL_HEX:
         return point.x.to_bytes(32, byteorder=ENDIAN) + point.y.to_bytes(32, byteorder=ENDIAN)
@@ -135,6 +210,43 @@ def point_to_bytes(point: Point, address_format: AddressFormat = AddressFormat.F
 
 
 def bytes_to_point(point_bytes: bytes) -> Point:
+    if not isinstance(point_bytes, bytes):
+        point_bytes = bytes(point_bytes)
+    point = address_cache.get('point', point_bytes)
+    if point is None:
+        point = _bytes_to_point(point_bytes)
+        address_cache.put('point', point_bytes, point)
+    return point
+
+
+def is_on_curve(point_bytes: bytes) -> bool:
+    '''
+    Checks that serialized address bytes hold a point of the curve, without
+    decompressing or building the point.
+    '''
+    if not isinstance(point_bytes, bytes):
+        point_bytes = bytes(point_bytes)
+    valid = address_cache.get('on_curve', point_bytes)
+    if valid is None:
+        valid = _is_on_curve(point_bytes)
+        address_cache.put('on_curve', point_bytes, valid)
+    return valid
+
+
+def _is_on_curve(point_bytes: bytes) -> bool:
+    a, b, p = CURVE.a, CURVE.b, CURVE.p
+    if len(point_bytes) == 64:
+        x, y = int.from_bytes(point_bytes[:32], ENDIAN), int.from_bytes(point_bytes[32:], ENDIAN)
+        return x < p and y < p and (y * y - (x ** 3 + a * x + b)) % p == 0
+    elif len(point_bytes) == 33:
+        x = int.from_bytes(point_bytes[1:], ENDIAN)
+        y2 = (x ** 3 + a * x + b) % p
+        # Euler's criterion: y2 has a square root when it is a quadratic residue
+        return x < p and (y2 == 0 or pow(y2, (p - 1) // 2, p) == 1)
+    return False
+
+
+def _bytes_to_point(point_bytes: bytes) -> Point:
     if len(point_bytes) == 64:
         x, y = int.from_bytes(point_bytes[:32], ENDIAN), int.from_bytes(point_bytes[32:], ENDIAN)
         return Point(x, y, CURVE)
@@ -146,6 +258,24 @@ def bytes_to_point(point_bytes: bytes) -> Point:
         raise NotImplementedError()
 
 
+def to_smallest(amount) -> int:
+    """
+    Converts a coin amount, as Decimal, string, int or float, to an integer
+    amount in the smallest unit.
+    """
+    if isinstance(amount, int):
+        return amount * SMALLEST
+    if not isinstance(amount, Decimal):
+        amount = Decimal(str(amount))
+    value = amount * SMALLEST
+    assert value % 1 == 0, 'too many decimal digits'
+    return int(value)
+
+
+def from_smallest(value: int) -> Decimal:
+    return Decimal(value) / SMALLEST
+
+
 def round_up_decimal(decimal: Decimal, round_up_length: str = '0.00000001'):
     round_up_length = Decimal(round_up_length)
     if (decimal * SMALLEST) % 1 != 0.0:
@@ -153,18 +283,50 @@ def round_up_decimal(decimal: Decimal, round_up_length: str = '0.00000001'):
     return decimal
 
 
+def round_to_smallest(amount) -> int:
+    '''
+    Converts an amount returned by the node, which may be a float such as
+    0.30000000000000004, to an integer amount in the smallest unit, rounding
+    off the digits below it.
+    '''
+    if isinstance(amount, int):
+        return amount * SMALLEST
+    return to_smallest(round_up_decimal(Decimal(str(amount))))
+
+
 def bytes_to_string(point_bytes: bytes) -> str:
-    point = bytes_to_point(point_bytes)
+    if not isinstance(point_bytes, bytes):
+        point_bytes = bytes(point_bytes)
+    address = address_cache.get('address', point_bytes)
+    if address is None:
+        address = _bytes_to_string(point_bytes)
+        address_cache.put('address', point_bytes, address)
+    return address
+
+
+def _bytes_to_string(point_bytes: bytes) -> str:
+    # Serialized addresses already are the string's payload, so they are
+    # encoded directly instead of being decompressed to a point first.
     if len(point_bytes) == 64:
-        address_format = AddressFormat.FULL_HEX
-    elif len(point_bytes) == 33:
-        address_format = AddressFormat.COMPRESSED
-    else:
+        return point_bytes.hex()
+    elif len(point_bytes) != 33:
         raise NotImplementedError()
-    return point_to_string(point, address_format)
+    elif point_bytes[0] in (42, 43):
+        address = base58.b58encode(point_bytes)
+        return address if isinstance(address, str) else address.decode('utf-8')
+    return point_to_string(bytes_to_point(point_bytes), AddressFormat.COMPRESSED)
 
 
 def point_to_string(point: Point, address_format: AddressFormat = AddressFormat.COMPRESSED) -> str:
+    key = (point.x, point.y, address_format)
+    address = address_cache.get('string', key)
+    if address is None:
+        address = _point_to_string(point, address_format)
+        address_cache.put('string', key, address)
+    return address
+
+
+def _point_to_string(point: Point, address_format: AddressFormat) -> str:
     if address_format is AddressFormat.FULL_HEX:
         point_bytes = point_to_bytes(point)
         return point_bytes.hex()
@@ -177,10 +339,13 @@ def point_to_string(point: Point, address_format: AddressFormat = AddressFormat.
 
 
 def string_to_bytes(string: str) -> bytes:
-    try:
-        point_bytes = bytes.fromhex(string)
-    except ValueError:
-        point_bytes = base58.b58decode(string)
+    point_bytes = address_cache.get('bytes', string)
+    if point_bytes is None:
+        try:
+            point_bytes = bytes.fromhex(string)
+        except ValueError:
+            point_bytes = base58.b58decode(string)
+        address_cache.put('bytes', string, point_bytes)
     return point_bytes
 
 
@@ -0,0 +1,62 @@
+from typing import Dict, Iterable, Tuple
+
+from fastecdsa import keys
+from fastecdsa.point import Point
+
+from .constants import CURVE
+
+
+class Signer:
+    """
+    Signs transactions with a fixed set of private keys.
+
+    Public keys are derived once, when the signer is created, and every
+    distinct key signs a transaction only once: the preimage is the same for
+    all inputs, so the signature is shared by all the inputs the key owns.
+    """
+
+    def __init__(self, private_keys: Iterable[int] = ()):
+        self._keys: Dict[Tuple[int, int], int] = {}
+        for private_key in private_keys:
+            self.add_key(private_key)
+
+    @classmethod
+    def from_key_pairs(cls, key_pairs):
+        """
+        Builds a signer from ``(private_key, public_key)`` pairs, like the
+        keystore's ``KeyPair`` records, without deriving the public keys again.
+        """
+        signer = cls()
+        for key_pair in key_pairs:
+            signer.add_key(key_pair.private_key, key_pair.public_key)
+        return signer
+
+    def add_key(self, private_key: int, public_key: Point = None):
+        if public_key is None:
+            public_key = keys.get_public_key(private_key, CURVE)
+        self._keys[(public_key.x, public_key.y)] = private_key
+
+    def sign(self, transaction):
+        for tx_input in transaction.inputs:
+            if tx_input.private_key is None and (
+                tx_input.public_key or tx_input.transaction
+            ):
+                input_public_key = (
+                    tx_input.public_key
+                    or tx_input.transaction.outputs[tx_input.index].public_key
+                )
+                tx_input.private_key = self._keys.get(
+                    (input_public_key.x, input_public_key.y)
+                )
+
+        tx_bytes = transaction.tobytes(False)
+        signatures = {}
+        for tx_input in transaction.inputs:
+            if tx_input.private_key is None:
+                continue
+            if tx_input.private_key in signatures:
+                tx_input.signed = signatures[tx_input.private_key]
+            else:
+                tx_input.sign(tx_bytes)
+                signatures[tx_input.private_key] = tx_input.signed
+        return transaction
@@ -1,28 +1,41 @@
 from decimal import Decimal
-from io import BytesIO
 from typing import List
 
-from fastecdsa import keys
-from icecream import ic
-
-from .coinbase_transaction import CoinbaseTransaction
-from .constants import ENDIAN, SMALLEST, CURVE
+from .constants import ENDIAN, MAX_INPUTS, MAX_OUTPUTS
+from .decoder import decode_transaction
 from .helpers import (
     get_transaction_type_from_message,
+    ic,
     sha256,
     TransactionType,
-    OutputType,
-    bytes_to_string,
-    point_to_string,
-    InputType,
 )
+from .signer import Signer
 from .transaction_input import TransactionInput
 from .transaction_output import TransactionOutput
 
 print = ic
 
 
+def _same_items(items, other_items):
+    return len(items) == len(other_items) and all(
+        item is other_item for item, other_item in zip(items, other_items)
+    )
+
+
 class Transaction:
+    __slots__ = (
+        "inputs",
+        "outputs",
+        "message",
+        "transaction_type",
+        "version",
+        "_hex",
+        "_serialized_key",
+        "_serialized",
+        "fees",
+        "tx_hash",
+    )
+
     def __init__(
         self,
         inputs: List[TransactionInput],
@@ -30,13 +43,13 @@ class Transaction:
         message: bytes = None,
         version: int = None,
     ):
-        if len(inputs) >= 256:
+        if len(inputs) > MAX_INPUTS:
             raise Exception(
-                f"You can spend max 255 inputs in a single transactions, not {len(inputs)}"
+                f"You can spend max {MAX_INPUTS} inputs in a single transactions, not {len(inputs)}"
             )
-        if len(outputs) >= 256:
+        if len(outputs) > MAX_OUTPUTS:
             raise Exception(
-                f"You can have max 255 outputs in a single transactions, not {len(outputs)}"
+                f"You can have max {MAX_OUTPUTS} outputs in a single transactions, not {len(outputs)}"
             )
         self.inputs = inputs
         self.outputs = outputs
@@ -53,53 +66,83 @@ class Transaction:
             raise NotImplementedError()
         self.version = version
         self._hex: str = None
+        self._serialized_key = None
+        self._serialized = None
         self.fees: Decimal = None
         self.tx_hash: str = None
 
-    def hex(self, full: bool = True):
-        inputs, outputs = self.inputs, self.outputs
-        hex_inputs = "".join(tx_input.tobytes().hex() for tx_input in inputs)
-        hex_outputs = "".join(tx_output.tobytes().hex() for tx_output in outputs)
+    def tobytes(self, full: bool = True) -> bytes:
+        """
+        Serializes the transaction. With ``full=False`` this is the preimage
+        that gets signed, which is cached until the inputs, outputs, message
+        or version change.
+        """
+        core, message = self._serialize()
+        if not full:
+            if self.version <= 2 or self.message is None:
+                return core
+            return core + message
 
-        version = self.version
+        signatures = []
+        signed = set()
+        for tx_input in self.inputs:
+            if tx_input.signed not in signed:
+                signed.add(tx_input.signed)
+                signatures.append(tx_input.signature_bytes())
+        return b"".join([core, message, *signatures])
+
+    def signed_size(self, signatures: int = 1) -> int:
+        """
+        Returns the size in bytes of the transaction once signed by
+        ``signatures`` distinct keys, without signing it.
+        """
+        core, message = self._serialize()
+        return len(core) + len(message) + 64 * signatures
+
+    def hex(self, full: bool = True):
+        self._hex = self.tobytes(full).hex()
+        return self._hex
 
-        self._hex = "".join(
+    def _serialize(self):
+        # Inputs and outputs cache their bytes until one of their fields
+        # changes, so the same bytes objects mean nothing changed
+        key = (
+            self.version,
+            self.message,
+            [tx_input.tobytes() for tx_input in self.inputs],
+            [tx_output.tobytes() for tx_output in self.outputs],
+        )
+        cached_key = self._serialized_key
+        if (
+            cached_key is not None
+            and cached_key[:2] == key[:2]
+            and _same_items(cached_key[2], key[2])
+            and _same_items(cached_key[3], key[3])
+        ):
+            return self._serialized
+
+        inputs, outputs = key[2], key[3]
+        core = b"".join(
             [
-                version.to_bytes(1, ENDIAN).hex(),
-                len(inputs).to_bytes(1, ENDIAN).hex(),
-                hex_inputs,
-                (len(outputs)).to_bytes(1, ENDIAN).hex(),
-                hex_outputs,
+                bytes([self.version, len(inputs)]),
+                *inputs,
+                bytes([len(outputs)]),
+                *outputs,
             ]
         )
-
-        if not full and (version <= 2 or self.message is None):
-            return self._hex
-
-        if self.message is not None:
-            if version <= 2:
-                self._hex += bytes([1, len(self.message)]).hex()
-            else:
-                self._hex += bytes([1]).hex()
-                self._hex += (len(self.message)).to_bytes(2, ENDIAN).hex()
-            self._hex += self.message.hex()
-            if not full:
-                return self._hex
+        if self.message is None:
+            message = bytes([0])
+        elif self.version <= 2:
+            message = bytes([1, len(self.message)]) + self.message
         else:
-            self._hex += (0).to_bytes(1, ENDIAN).hex()
-
-        signatures = []
-        for tx_input in inputs:
-            signed = tx_input.get_signature()
-            if signed not in signatures:
-                signatures.append(signed)
-                self._hex += signed
-
-        return self._hex
+            message = bytes([1]) + len(self.message).to_bytes(2, ENDIAN) + self.message
+        self._serialized_key = key
+        self._serialized = (core, message)
+        return self._serialized
 
     def hash(self):
         if self.tx_hash is None:
-            self.tx_hash = sha256(self.hex())
+            self.tx_hash = sha256(self.tobytes())
         return self.tx_hash
 
     def _verify_double_spend_same_transaction(self):
@@ -111,135 +154,37 @@ class Transaction:
             used_inputs.append(input_hash)
         return True
 
-    async def _check_signature(self):
+    async def _check_signature(self, encoding: str = None):
         tx_hex = self.hex(False)
-        checked_signatures = []
+        checked_signatures = set()
         for tx_input in self.inputs:
             if tx_input.signed is None:
                 print("not signed")
                 return False
-            await tx_input.get_public_key()
-            signature = (tx_input.public_key, tx_input.signed)
+            public_key = await tx_input.get_public_key()
+            signature = (public_key.x, public_key.y, tx_input.signed)
             if signature in checked_signatures:
                 continue
-            if not await tx_input.verify(tx_hex):
+            if not await tx_input.verify(tx_hex, encoding):
                 print("signature not valid")
                 return False
-            checked_signatures.append(signature)
+            checked_signatures.add(signature)
         return True
 
-    def sign(self, private_keys: list = []):
-        for private_key in private_keys:
-            for input in self.inputs:
-                if input.private_key is None and (
-                    input.public_key or input.transaction
-                ):
-                    public_key = keys.get_public_key(private_key, CURVE)
-                    input_public_key = (
-                        input.public_key
-                        or input.transaction.outputs[input.index].public_key
-                    )
-                    if public_key == input_public_key:
-                        input.private_key = private_key
-        for input in self.inputs:
-            if input.private_key is not None:
-                input.sign(self.hex(False))
-        return self
+    def sign(self, private_keys: list = [], signer: Signer = None):
+        if signer is None:
+            signer = Signer(private_keys)
+        return signer.sign(self)
 
     @staticmethod
     async def from_hex(hexstring: str, check_signatures: bool = True):
-        tx_bytes = BytesIO(bytes.fromhex(hexstring))
-        version = int.from_bytes(tx_bytes.read(1), ENDIAN)
-        if version > 3:
-            raise NotImplementedError()
-
-        inputs_count = int.from_bytes(tx_bytes.read(1), ENDIAN)
-
-        inputs = []
-
-        for i in range(0, inputs_count):
-            tx_hex = tx_bytes.read(32).hex()
-            tx_index = int.from_bytes(tx_bytes.read(1), ENDIAN)
-            input_type = int.from_bytes(tx_bytes.read(1), ENDIAN)
-            inputs.append(
-                TransactionInput(
-                    tx_hex, index=tx_index, input_type=InputType(input_type)
-                )
-            )
-
-        outputs_count = int.from_bytes(tx_bytes.read(1), ENDIAN)
-
-        outputs = []
-
-        for i in range(0, outputs_count):
-            pubkey = tx_bytes.read(64 if version == 1 else 33)
-            amount_length = int.from_bytes(tx_bytes.read(1), ENDIAN)
-            amount = int.from_bytes(tx_bytes.read(amount_length), ENDIAN) / Decimal(
-                SMALLEST
-            )
-            transaction_type = int.from_bytes(tx_bytes.read(1), ENDIAN)
-            outputs.append(
-                TransactionOutput(
-                    bytes_to_string(pubkey), amount, OutputType(transaction_type)
-                )
-            )
-
-        specifier = int.from_bytes(tx_bytes.read(1), ENDIAN)
-        if specifier == 36:
-            # assert len(inputs) == 1 and len(outputs) == 1
-            assert len(inputs) == 1
-            coinbase_transaction = CoinbaseTransaction(
-                inputs[0].tx_hash, outputs[0].address, outputs[0].amount
-            )
-            if len(outputs) > 1:
-                coinbase_transaction.outputs.extend(outputs[1:])
-            return coinbase_transaction
-        else:
-            if specifier == 1:
-                message_length = int.from_bytes(
-                    tx_bytes.read(1 if version <= 2 else 2), ENDIAN
-                )
-                message = tx_bytes.read(message_length)
-            else:
-                message = None
-                assert specifier == 0
-
-            signatures = []
-
-            while True:
-                signed = (
-                    int.from_bytes(tx_bytes.read(32), ENDIAN),
-                    int.from_bytes(tx_bytes.read(32), ENDIAN),
-                )
-                if signed[0] == 0:
-                    break
-                signatures.append(signed)
-
-            if len(signatures) == 1:
-                for tx_input in inputs:
-                    tx_input.signed = signatures[0]
-            elif len(inputs) == len(signatures):
-                for i, tx_input in enumerate(inputs):
-                    tx_input.signed = signatures[i]
-            else:
-                if not check_signatures:
-                    return Transaction(inputs, outputs, message, version)
-                index = {}
-                for tx_input in inputs:
-                    public_key = point_to_string(await tx_input.get_public_key())
-                    if public_key not in index.keys():
-                        index[public_key] = []
-                    index[public_key].append(tx_input)
-
-                for i, signed in enumerate(signatures):
-                    for tx_input in index[list(index.keys())[i]]:
-                        tx_input.signed = signed
-
-            return Transaction(inputs, outputs, message, version)
+        return await decode_transaction(bytes.fromhex(hexstring)).to_transaction(
+            check_signatures
+        )
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
-            return self.hex() == other.hex()
+            return self.tobytes() == other.tobytes()
         else:
             return False
 
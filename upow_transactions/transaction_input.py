@@ -1,18 +1,39 @@
 from decimal import Decimal
-from typing import Tuple
+from typing import Tuple, Union
 
 from fastecdsa import ecdsa
 from fastecdsa.point import Point
 
-from .constants import CURVE, ENDIAN, SMALLEST
-from .helpers import point_to_string, string_to_point, InputType
+from .constants import ENDIAN
+from .helpers import (
+    from_smallest,
+    point_to_string,
+    string_to_point,
+    to_smallest,
+    InputType,
+)
+from .verification import cached_verify_signature
 
+_SERIALIZED_FIELDS = {"tx_hash", "index", "input_type"}
 
-class TransactionInput:
-    public_key = None
 
-    signed: Tuple[int, int] = None
-    amount: Decimal = None
+class TransactionInput:
+    __slots__ = (
+        "tx_hash",
+        "index",
+        "private_key",
+        "transaction",
+        "transaction_info",
+        "value",
+        "public_key",
+        "input_type",
+        "signed",
+        "_bytes",
+    )
+
+    signed: Tuple[int, int]
+    # Amount in the smallest unit, None until known
+    value: int
 
     def __init__(
         self,
@@ -23,18 +44,37 @@ class TransactionInput:
         amount: Decimal = None,
         public_key: Point = None,
         input_type: InputType = InputType.REGULAR,
+        value: int = None,
     ):
+        self._bytes = None
         self.tx_hash = input_tx_hash
         self.index = index
         self.private_key = private_key
         self.transaction = transaction
         self.transaction_info = None
-        self.amount = amount
+        self.value = value
+        if amount is not None:
+            self.amount = amount
         self.public_key = public_key
         self.input_type = input_type
-        if transaction is not None and amount is None:
+        self.signed = None
+        if transaction is not None and self.value is None:
             self.get_related_output()
 
+    def __setattr__(self, name, value):
+        # The serialized input is cached until one of its fields changes
+        if name in _SERIALIZED_FIELDS:
+            object.__setattr__(self, "_bytes", None)
+        object.__setattr__(self, name, value)
+
+    @property
+    def amount(self) -> Decimal:
+        return from_smallest(self.value) if self.value is not None else None
+
+    @amount.setter
+    def amount(self, amount):
+        self.value = to_smallest(amount) if amount is not None else None
+
     async def get_transaction(self):
         return self.transaction
 
@@ -45,7 +85,7 @@ class TransactionInput:
     async def get_related_output(self):
         tx = await self.get_transaction()
         related_output = tx.outputs[self.index]
-        self.amount = related_output.amount
+        self.value = related_output.value
         return related_output
 
     async def get_related_input(self):
@@ -62,9 +102,9 @@ class TransactionInput:
         tx = await self.get_transaction_info()
         related_output = {
             "address": tx["outputs_addresses"][self.index],
-            "amount": Decimal(tx["outputs_amounts"][self.index]) / SMALLEST,
+            "amount": from_smallest(int(tx["outputs_amounts"][self.index])),
         }
-        self.amount = related_output["amount"]
+        self.value = int(tx["outputs_amounts"][self.index])
         return related_output
 
     async def get_amount(self):
@@ -85,9 +125,10 @@ class TransactionInput:
             return (await self.get_related_input()).address
         return (await self.get_related_input_info())["address"]
 
-    def sign(self, tx_hex: str, private_key: int = None):
+    def sign(self, tx_hex: Union[str, bytes], private_key: int = None):
         private_key = private_key if private_key is not None else self.private_key
-        self.signed = ecdsa.sign(bytes.fromhex(tx_hex), private_key)
+        tx_bytes = tx_hex if isinstance(tx_hex, bytes) else bytes.fromhex(tx_hex)
+        self.signed = ecdsa.sign(tx_bytes, private_key)
 
     async def get_public_key(self):
         return self.public_key or string_to_point(await self.get_address())
@@ -96,50 +137,49 @@ class TransactionInput:
         return self.public_key or string_to_point(await self.get_voter_address())
 
     def tobytes(self):
-        return (
-            bytes.fromhex(self.tx_hash)
-            + self.index.to_bytes(1, ENDIAN)
-            + self.input_type.to_bytes(1, ENDIAN)
-        )
+        if self._bytes is None:
+            self._bytes = (
+                bytes.fromhex(self.tx_hash)
+                + self.index.to_bytes(1, ENDIAN)
+                + self.input_type.to_bytes(1, ENDIAN)
+            )
+        return self._bytes
 
     def get_signature(self):
-        return (
-            self.signed[0].to_bytes(32, ENDIAN).hex()
-            + self.signed[1].to_bytes(32, ENDIAN).hex()
-        )
+        return self.signature_bytes().hex()
 
-    async def verify(self, input_tx) -> bool:
+    def signature_bytes(self):
+        return self.signed[0].to_bytes(32, ENDIAN) + self.signed[1].to_bytes(32, ENDIAN)
+
+    async def verify(self, input_tx, encoding: str = None) -> bool:
         try:
             public_key = await self.get_public_key()
         except AssertionError:
             return False
         # print('verifying with', point_to_string(public_key))
 
-        return ecdsa.verify(
-            self.signed, bytes.fromhex(input_tx), public_key, CURVE
-        ) or ecdsa.verify(self.signed, input_tx, public_key, CURVE)
+        return cached_verify_signature(self.signed, input_tx, public_key, encoding)
 
-    async def verify_revoke_tx(self, input_tx) -> bool:
+    async def verify_revoke_tx(self, input_tx, encoding: str = None) -> bool:
         try:
             public_key = await self.get_voter_public_key()
         except AssertionError:
             return False
         # print('verifying with', point_to_string(public_key))
 
-        return ecdsa.verify(
-            self.signed, bytes.fromhex(input_tx), public_key, CURVE
-        ) or ecdsa.verify(self.signed, input_tx, public_key, CURVE)
+        return cached_verify_signature(self.signed, input_tx, public_key, encoding)
 
     @property
     def as_dict(self):
-        self_dict = vars(self).copy()
-        self_dict["signed"] = self_dict["signed"] is not None
-        if "public_key" in self_dict:
-            self_dict["public_key"] = point_to_string(self_dict["public_key"])
-        if "transaction" in self_dict:
-            del self_dict["transaction"]
-        if "private_key" in self_dict:
-            del self_dict["private_key"]
+        self_dict = {
+            name: getattr(self, name)
+            for name in self.__slots__
+            if name not in ("transaction", "private_key", "value", "_bytes")
+        }
+        self_dict["amount"] = self.amount
+        self_dict["signed"] = self.signed is not None
+        if self.public_key is not None:
+            self_dict["public_key"] = point_to_string(self.public_key)
         return self_dict
 
     def __eq__(self, other):
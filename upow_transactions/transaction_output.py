@@ -1,15 +1,37 @@
 from decimal import Decimal
 
-from .constants import ENDIAN, SMALLEST, CURVE
-from .helpers import byte_length, string_to_point, string_to_bytes, OutputType
+from .constants import ENDIAN, CURVE
+from .helpers import (
+    byte_length,
+    bytes_to_point,
+    bytes_to_string,
+    from_smallest,
+    is_on_curve,
+    string_to_bytes,
+    to_smallest,
+    OutputType,
+)
+
+_SERIALIZED_FIELDS = {"address", "address_bytes", "value", "transaction_type"}
 
 
 class TransactionOutput:
+    __slots__ = (
+        "address",
+        "address_bytes",
+        "_public_key",
+        "value",
+        "transaction_type",
+        "is_stake",
+        "_bytes",
+    )
+
     def __init__(
         self,
         address: str,
         amount: Decimal,
         transaction_type: OutputType = OutputType.REGULAR,
+        address_bytes: bytes = None,
     ):
         from fastecdsa.point import Point
 
@@ -17,32 +39,101 @@ class TransactionOutput:
             raise Exception(
                 "TransactionOutput does not accept Point anymore. Pass the address string instead"
             )
+        self._set(address, to_smallest(amount), transaction_type, address_bytes)
+
+    def _set(
+        self,
+        address: str,
+        value: int,
+        transaction_type: OutputType,
+        address_bytes: bytes = None,
+    ):
+        self._bytes = None
         self.address = address
-        self.address_bytes = string_to_bytes(address)
-        self.public_key = string_to_point(address)
-        assert (amount * SMALLEST) % 1 == 0.0, "too many decimal digits"
-        self.amount = amount
+        self.address_bytes = (
+            address_bytes if address_bytes is not None else string_to_bytes(address)
+        )
+        self._public_key = None
+        self.value = value
         self.transaction_type = transaction_type
         self.is_stake = transaction_type == OutputType.STAKE
 
-    def tobytes(self):
-        amount = int(self.amount * SMALLEST)
-        count = byte_length(amount)
-        return (
-            self.address_bytes
-            + count.to_bytes(1, ENDIAN)
-            + amount.to_bytes(count, ENDIAN)
-            + self.transaction_type.to_bytes(1, ENDIAN)
+    def __setattr__(self, name, value):
+        # The serialized output is cached until one of its fields changes
+        if name in _SERIALIZED_FIELDS:
+            object.__setattr__(self, "_bytes", None)
+        object.__setattr__(self, name, value)
+
+    @classmethod
+    def from_value(
+        cls,
+        address: str,
+        value: int,
+        transaction_type: OutputType = OutputType.REGULAR,
+        address_bytes: bytes = None,
+    ):
+        """
+        Builds an output from an amount already in the smallest unit.
+        """
+        tx_output = cls.__new__(cls)
+        tx_output._set(address, value, transaction_type, address_bytes)
+        return tx_output
+
+    @classmethod
+    def from_address_bytes(
+        cls,
+        address_bytes: bytes,
+        value: int,
+        transaction_type: OutputType = OutputType.REGULAR,
+    ):
+        """
+        Builds an output from the serialized address and an amount in the
+        smallest unit, e.g. when decoding, without parsing the address string
+        again. The address must be a point of the curve.
+        """
+        address_bytes = bytes(address_bytes)
+        if not is_on_curve(address_bytes):
+            raise Exception(
+                f"Address {address_bytes.hex()} is not a point of the curve"
+            )
+        return cls.from_value(
+            bytes_to_string(address_bytes), value, transaction_type, address_bytes
         )
 
+    @property
+    def amount(self) -> Decimal:
+        return from_smallest(self.value)
+
+    @property
+    def public_key(self):
+        # Decompressing the address needs a modular square root, so the point
+        # is only derived when something reads it.
+        if self._public_key is None:
+            self._public_key = bytes_to_point(self.address_bytes)
+        return self._public_key
+
+    def tobytes(self):
+        if self._bytes is None:
+            count = byte_length(self.value)
+            self._bytes = (
+                self.address_bytes
+                + count.to_bytes(1, ENDIAN)
+                + self.value.to_bytes(count, ENDIAN)
+                + self.transaction_type.to_bytes(1, ENDIAN)
+            )
+        return self._bytes
+
     def verify(self):
-        return self.amount > 0 and CURVE.is_point_on_curve(
+        return self.value > 0 and CURVE.is_point_on_curve(
             (self.public_key.x, self.public_key.y)
         )
 
     @property
     def as_dict(self):
-        res = vars(self).copy()
-        if "public_key" in res:
-            del res["public_key"]
-        return res
+        return {
+            "address": self.address,
+            "address_bytes": self.address_bytes,
+            "amount": self.amount,
+            "transaction_type": self.transaction_type,
+            "is_stake": self.is_stake,
+        }
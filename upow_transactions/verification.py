@@ -0,0 +1,194 @@
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Tuple
+
+from fastecdsa import ecdsa
+from fastecdsa.ecdsa import EcdsaError
+
+from .constants import CURVE
+
+# How the signed preimage was encoded. None tries the raw bytes first and
+# then falls back to the hex string, like older wallets signed it.
+ENCODINGS = (None, "bytes", "hex")
+
+
+def verify_signature(
+    signed: Tuple[int, int], tx_hex: str, public_key, encoding: str = None
+) -> bool:
+    if encoding not in ENCODINGS:
+        raise ValueError(
+            f"Unknown encoding {encoding!r}, expected one of {', '.join(map(repr, ENCODINGS))}"
+        )
+    if encoding != "hex" and ecdsa.verify(
+        signed, bytes.fromhex(tx_hex), public_key, CURVE
+    ):
+        return True
+    if encoding != "bytes" and ecdsa.verify(signed, tx_hex, public_key, CURVE):
+        return True
+    return False
+
+
+class SignatureCache:
+    """
+    Bounded cache of signature verification results, keyed by the preimage
+    hash, public key, signature and encoding. The least recently used entry
+    is evicted once ``maxsize`` entries are stored; ``maxsize=0`` disables
+    caching.
+    """
+
+    def __init__(self, maxsize: int = 65536):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._results = OrderedDict()
+
+    @staticmethod
+    def key(signed: Tuple[int, int], tx_hex: str, public_key, encoding: str = None):
+        preimage_hash = hashlib.sha256(tx_hex.encode()).digest()
+        return preimage_hash, public_key.x, public_key.y, signed, encoding
+
+    def get(self, key):
+        result = self._results.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._results.move_to_end(key)
+        return result
+
+    def put(self, key, result: bool):
+        if self.maxsize <= 0:
+            return
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._results),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        self._results.clear()
+        self.hits = self.misses = self.evictions = 0
+
+
+signature_cache = SignatureCache()
+
+
+def cached_verify_signature(
+    signed: Tuple[int, int],
+    tx_hex: str,
+    public_key,
+    encoding: str = None,
+    cache: SignatureCache = None,
+) -> bool:
+    cache = cache if cache is not None else signature_cache
+    key = cache.key(signed, tx_hex, public_key, encoding)
+    result = cache.get(key)
+    if result is None:
+        result = verify_signature(signed, tx_hex, public_key, encoding)
+        cache.put(key, result)
+    return result
+
+
+def _verify_jobs(jobs):
+    results = []
+    for tx_hex, public_key, signed, encoding in jobs:
+        try:
+            results.append(verify_signature(signed, tx_hex, public_key, encoding))
+        except EcdsaError:
+            results.append(False)
+    return results
+
+
+async def verify_transactions(
+    transactions,
+    encoding: str = None,
+    max_workers: int = None,
+    executor: Executor = None,
+    cache: SignatureCache = None,
+) -> List[bool]:
+    """
+    Checks the input signatures of many transactions, spreading the ECDSA
+    verifications over a process pool. Each distinct (preimage, public key,
+    signature) is only verified once, and results already in ``cache`` are
+    not verified again. Returns one result per transaction.
+
+    Public keys must be resolvable from the inputs, like in
+    ``Transaction._check_signature``.
+    """
+    cache = cache if cache is not None else signature_cache
+    results = {}
+    pending = {}
+    transaction_keys = []
+    for transaction in transactions:
+        tx_hex = transaction.hex(False)
+        keys = []
+        for tx_input in transaction.inputs:
+            if tx_input.signed is None:
+                keys = None
+                break
+            try:
+                public_key = await tx_input.get_public_key()
+            except AssertionError:
+                keys = None
+                break
+            key = cache.key(tx_input.signed, tx_hex, public_key, encoding)
+            if key not in results:
+                results[key] = cache.get(key)
+                if results[key] is None:
+                    pending[key] = (
+                        tx_hex,
+                        (public_key.x, public_key.y),
+                        tx_input.signed,
+                        encoding,
+                    )
+            keys.append(key)
+        transaction_keys.append(keys)
+
+    if pending:
+        pending_keys = list(pending)
+        own_executor = executor is None
+        max_workers = max_workers or os.cpu_count() or 1
+        if own_executor:
+            executor = ProcessPoolExecutor(max_workers)
+        try:
+            chunk_size = max(1, -(-len(pending_keys) // (max_workers * 4)))
+            chunks = [
+                pending_keys[i : i + chunk_size]
+                for i in range(0, len(pending_keys), chunk_size)
+            ]
+            loop = asyncio.get_running_loop()
+            chunk_results = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        executor, _verify_jobs, [pending[key] for key in chunk]
+                    )
+                    for chunk in chunks
+                )
+            )
+        finally:
+            if own_executor:
+                executor.shutdown()
+        for chunk, chunk_result in zip(chunks, chunk_results):
+            for key, result in zip(chunk, chunk_result):
+                results[key] = result
+                cache.put(key, result)
+
+    return [
+        keys is not None and all(results[key] for key in keys)
+        for keys in transaction_keys
+    ]
@@ -0,0 +1,123 @@
+from functools import cached_property
+
+from upow_transactions.helpers import round_to_smallest, string_to_point
+from upow_transactions.transaction_input import TransactionInput
+from utils import profiling
+from utils.utxo_table import UTXOTable
+
+
+class AddressState:
+    """
+    Parsed view of a ``get_address_info`` result.
+
+    The pending spent outputs are hashed once and the pending transactions are
+    indexed by ``(transaction_type, input address)``. Each output category is
+    converted to ``TransactionInput`` on first access, in a single pass, with
+    the address point decompressed only once.
+    """
+
+    def __init__(self, result: dict, address: str = None):
+        self.result = result
+        self.address = address
+        self.pending_spent_outputs = {
+            (output["tx_hash"], output["index"])
+            for output in result.get("pending_spent_outputs") or []
+        }
+        self.is_inode = result.get("is_inode")
+        self.is_validator = result.get("is_validator")
+
+    @cached_property
+    def public_key(self):
+        return string_to_point(self.address) if self.address else None
+
+    @cached_property
+    def pending_transactions(self):
+        pending_transactions = {}
+        for tx in self.result.get("pending_transactions") or []:
+            inputs = tx.get("inputs") or []
+            key = (tx.get("transaction_type"), inputs[0]["address"] if inputs else None)
+            pending_transactions.setdefault(key, []).append(tx)
+        return pending_transactions
+
+    @cached_property
+    def spendable_outputs(self):
+        return self._parse_outputs("spendable_outputs", self.public_key)
+
+    @cached_property
+    def stake_outputs(self):
+        return self._parse_outputs("stake_outputs", self.public_key)
+
+    @cached_property
+    def inode_registration_outputs(self):
+        return self._parse_outputs("inode_registration_outputs", self.public_key)
+
+    @cached_property
+    def delegate_spent_votes(self):
+        return self._parse_outputs("delegate_spent_votes")
+
+    @cached_property
+    def delegate_unspent_votes(self):
+        return self._parse_outputs("delegate_unspent_votes", self.public_key)
+
+    @cached_property
+    def validator_unspent_votes(self):
+        return self._parse_outputs("validator_unspent_votes", self.public_key)
+
+    def get_address_inputs(self):
+        return self.unspent(self.spendable_outputs)
+
+    def get_stake_inputs(self, check_pending_txs: bool = True):
+        return self.unspent(self.stake_outputs, check_pending_txs)
+
+    def get_inode_registration_inputs(self):
+        return self.unspent(self.inode_registration_outputs)
+
+    def get_delegate_spent_votes(self, check_pending_txs: bool = True):
+        return self.unspent(self.delegate_spent_votes, check_pending_txs)
+
+    def get_delegate_unspent_votes(self, check_pending_txs: bool = True):
+        return self.unspent(self.delegate_unspent_votes, check_pending_txs)
+
+    def get_validator_unspent_votes(self, check_pending_txs: bool = True):
+        return self.unspent(self.validator_unspent_votes, check_pending_txs)
+
+    def get_utxo_table(
+        self, category: str = "spendable_outputs", check_pending_txs: bool = True
+    ) -> UTXOTable:
+        """
+        Returns the outputs of ``category`` as a compact ``UTXOTable`` instead
+        of ``TransactionInput`` objects.
+        """
+        with profiling.stage("parse"):
+            return UTXOTable.from_outputs(
+                self.result.get(category) or [],
+                self.pending_spent_outputs if check_pending_txs else None,
+            )
+
+    def get_pending_transactions(self, transaction_type: str, address: str):
+        return self.pending_transactions.get((transaction_type, address), [])
+
+    def unspent(self, tx_inputs, check_pending_txs: bool = True):
+        if not check_pending_txs:
+            return list(tx_inputs)
+        pending_spent_outputs = self.pending_spent_outputs
+        return [
+            tx_input
+            for tx_input in tx_inputs
+            if (tx_input.tx_hash, tx_input.index) not in pending_spent_outputs
+        ]
+
+    def _parse_outputs(self, category: str, public_key=None):
+        with profiling.stage("parse"):
+            return self._build_inputs(category, public_key)
+
+    def _build_inputs(self, category: str, public_key=None):
+        return [
+            TransactionInput(
+                output["tx_hash"],
+                output["index"],
+                public_key=public_key,
+                value=round_to_smallest(output["amount"]),
+            )
+            for output in self.result.get(category) or []
+        ]
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import logging
+
+from utils.daemon import RPCError, WalletDaemon
+
+
+def parse_command(line: str):
+    """
+    Splits a batch line such as
+    ``{"command": "send", "from": "...", "to": "...", "amount": "1"}`` into
+    the command name, its id, if any, and its params.
+    """
+    command = json.loads(line)
+    if not isinstance(command, dict) or not isinstance(command.get("command"), str):
+        raise Exception("Expected an object with a 'command' name")
+    params = dict(command)
+    name = params.pop("command")
+    command_id = params.pop("id", None)
+    if name != "balance" and "from" not in params:
+        raise Exception(f"'{name}' needs a 'from' address")
+    return name, command_id, params
+
+
+async def run_batch(daemon: WalletDaemon, lines, parallelism: int = 8):
+    """
+    Runs the JSON lines commands of ``lines`` with the commands of the
+    ``daemon``, at most ``parallelism`` at a time, and yields a result for
+    each one as soon as it is done. Results are not in file order; each one
+    carries the ``line`` it belongs to. Commands from the same address run one
+    at a time.
+    """
+
+    async def run(line_number: int, line: str):
+        result = {"line": line_number}
+        try:
+            name, command_id, params = parse_command(line)
+            result.update(id=command_id, command=name)
+            result["result"] = await daemon.call(name, params)
+            result["ok"] = not isinstance(result["result"], dict) or result[
+                "result"
+            ].get("ok", True)
+        except RPCError as e:
+            result.update(ok=False, error=e.message)
+        except Exception as e:
+            logging.error(f"Error on line {line_number}: {e}")
+            result.update(ok=False, error=str(e))
+        return result
+
+    pending = set()
+    try:
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            if len(pending) >= parallelism:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield task.result()
+            pending.add(asyncio.create_task(run(line_number, line)))
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,117 @@
+from typing import List
+
+from upow_transactions.constants import MAX_INPUTS
+from upow_transactions.helpers import from_smallest
+from upow_transactions.transaction_input import TransactionInput
+from utils import profiling
+
+
+class InsufficientInputsError(Exception):
+    """
+    Raised when the inputs can't cover the amount within the input limit.
+    """
+
+
+def select_largest_first(
+    inputs: List[TransactionInput], amount: int, max_inputs: int = MAX_INPUTS
+):
+    """
+    Adds inputs from the largest down until ``amount``, in the smallest unit,
+    is covered.
+    """
+    selected = []
+    total = 0
+    for tx_input in sorted(inputs, key=lambda item: item.value, reverse=True):
+        if total >= amount:
+            break
+        if len(selected) == max_inputs:
+            break
+        selected.append(tx_input)
+        total += tx_input.value
+    if total < amount:
+        raise InsufficientInputsError(
+            f"Error: {from_smallest(amount)} cannot be covered with at most {max_inputs} inputs"
+        )
+    return selected
+
+
+def select_fewest_inputs(
+    inputs: List[TransactionInput], amount: int, max_inputs: int = MAX_INPUTS
+):
+    """
+    Picks the smallest single input covering ``amount``. When there is none,
+    falls back to largest first, which then needs the fewest inputs.
+    """
+    best = None
+    for tx_input in inputs:
+        if tx_input.value >= amount and (best is None or tx_input.value < best.value):
+            best = tx_input
+    if best is not None:
+        return [best]
+    return select_largest_first(inputs, amount, max_inputs)
+
+
+def select_branch_and_bound(
+    inputs: List[TransactionInput],
+    amount: int,
+    max_inputs: int = MAX_INPUTS,
+    max_tries: int = 100_000,
+):
+    """
+    Depth-first search for a set of inputs that adds up to exactly ``amount``,
+    so no change output is needed. Falls back to ``select_fewest_inputs`` when
+    no exact match is found within ``max_tries`` steps.
+    """
+    candidates = sorted(inputs, key=lambda item: item.value, reverse=True)
+    remaining = [0] * (len(candidates) + 1)
+    for index in range(len(candidates) - 1, -1, -1):
+        remaining[index] = remaining[index + 1] + candidates[index].value
+
+    selection = []
+    total = 0
+    index = 0
+    for _ in range(max_tries):
+        if total == amount and selection:
+            return [candidates[i] for i in selection]
+        if (
+            total > amount
+            or total + remaining[index] < amount
+            or len(selection) >= max_inputs
+        ):
+            if not selection:
+                break
+            # Drop the last included input and explore the branch without it,
+            # skipping inputs of the same amount as they lead to the same sums.
+            last = selection.pop()
+            total -= candidates[last].value
+            index = last + 1
+            while (
+                index < len(candidates)
+                and candidates[index].value == candidates[last].value
+            ):
+                index += 1
+            continue
+        selection.append(index)
+        total += candidates[index].value
+        index += 1
+
+    return select_fewest_inputs(inputs, amount, max_inputs)
+
+
+STRATEGIES = {
+    "branch_and_bound": select_branch_and_bound,
+    "largest_first": select_largest_first,
+    "fewest_inputs": select_fewest_inputs,
+}
+
+
+def select_inputs(
+    inputs: List[TransactionInput],
+    amount: int,
+    strategy: str = "fewest_inputs",
+    max_inputs: int = MAX_INPUTS,
+):
+    if strategy not in STRATEGIES:
+        raise Exception(f"Unknown coin selection strategy: {strategy}")
+    with profiling.stage("coin_selection"):
+        return STRATEGIES[strategy](inputs, amount, max_inputs)
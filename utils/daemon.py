@@ -0,0 +1,371 @@
+import asyncio
+import hmac
+import inspect
+import json
+import logging
+import os
+import secrets
+import stat
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from decimal import Decimal
+
+from utils.keystore import KeyStore
+from utils.utils import Utils
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+UNAUTHORIZED = -32001
+
+
+class RPCError(Exception):
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def load_token(path: str) -> str:
+    """
+    Returns the token stored in ``path``, creating the file with a new random
+    token, readable only by the current user, if it doesn't exist.
+    """
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(path) as file:
+            token = file.read().strip()
+        if not token:
+            raise Exception(f"Token file {path} is empty")
+        return token
+    token = secrets.token_hex(32)
+    with os.fdopen(fd, "w") as file:
+        file.write(token + "\n")
+    return token
+
+
+async def _is_listening(path: str) -> bool:
+    try:
+        _, writer = await asyncio.open_unix_connection(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        return False
+    writer.close()
+    return True
+
+
+async def _read_line(reader: asyncio.StreamReader):
+    """
+    Reads the next line, b"" at the end of the stream. A line longer than the
+    stream limit is skipped and returned as None.
+    """
+    try:
+        return await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as e:
+        return e.partial
+    except asyncio.LimitOverrunError:
+        pass
+    while True:
+        try:
+            await reader.readuntil(b"\n")
+            return None
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError as e:
+            await reader.readexactly(e.consumed)
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class WalletDaemon:
+    """
+    Serves wallet commands as JSON-RPC 2.0 over a local socket, one request
+    or response object per line.
+
+    One ``Utils`` and keystore are shared by every request, so the node
+    connection pool, the UTXO cache, the mempool and the address and
+    signature caches stay warm between calls. Requests run concurrently,
+    except that transactions from the same address are built one at a time
+    so they never pick the same outputs.
+    """
+
+    def __init__(self, wallet_utils: Utils, keystore: KeyStore) -> None:
+        self.wallet_utils = wallet_utils
+        self.keystore = keystore
+        self.methods = {
+            "send": self.send,
+            "balance": self.balance,
+            "stake": self.stake,
+            "unstake": self.unstake,
+            "register_inode": self.register_inode,
+            "de_register_inode": self.de_register_inode,
+            "register_validator": self.register_validator,
+            "vote": self.vote,
+            "revoke": self.revoke,
+        }
+        self._locks = defaultdict(asyncio.Lock)
+
+    async def serve_unix(self, path: str):
+        if os.path.lexists(path):
+            if not stat.S_ISSOCK(os.lstat(path).st_mode):
+                raise Exception(f"{path} exists and is not a socket")
+            if await _is_listening(path):
+                raise Exception(f"A daemon is already listening on {path}")
+            os.remove(path)
+        # The socket gives access to every key of the wallet, so it is created
+        # accessible to the current user only
+        umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self.handle_connection, path)
+        finally:
+            os.umask(umask)
+        logging.info(f"Wallet daemon listening on {path}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def serve_tcp(self, port: int, token: str, host: str = "127.0.0.1"):
+        """
+        Listens on ``host``:``port``. Any local user can connect to it, so every
+        request must carry ``token`` in its ``token`` member.
+        """
+        if not token:
+            raise Exception("A token is required to listen on a port")
+
+        async def handle_connection(reader, writer):
+            await self.handle_connection(reader, writer, token)
+
+        server = await asyncio.start_server(handle_connection, host, port)
+        logging.info(f"Wallet daemon listening on {host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader, writer, token: str = None):
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(line: bytes):
+            if line is None:
+                response = self._error(None, INVALID_REQUEST, "Request too long")
+            else:
+                response = await self.handle_line(line, token)
+            if response is None:
+                return
+            async with write_lock:
+                writer.write(json.dumps(response, default=_json_default).encode())
+                writer.write(b"\n")
+                await writer.drain()
+
+        try:
+            while (line := await _read_line(reader)) != b"":
+                if line is not None and not line.strip():
+                    continue
+                task = asyncio.create_task(respond(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def handle_line(self, line: bytes, token: str = None):
+        """
+        Runs one JSON-RPC request and returns the response object, or None for
+        a notification. When ``token`` is set, requests without it are refused.
+        """
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return self._error(None, PARSE_ERROR, "Parse error")
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return self._error(None, INVALID_REQUEST, "Invalid request")
+        request_id = request.get("id")
+        if token is not None and not hmac.compare_digest(
+            str(request.get("token", "")).encode(), token.encode()
+        ):
+            return self._error(request_id, UNAUTHORIZED, "Invalid token")
+        try:
+            result = await self.call(request["method"], request.get("params"))
+        except RPCError as e:
+            response = self._error(request_id, e.code, e.message)
+        except Exception as e:
+            logging.error(f"Error in {request['method']}: {e}")
+            response = self._error(request_id, SERVER_ERROR, str(e))
+        else:
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        return response if "id" in request else None
+
+    async def call(self, method: str, params=None):
+        function = self.methods.get(method)
+        if function is None:
+            raise RPCError(METHOD_NOT_FOUND, f"Unknown method: {method}")
+        params = params if params is not None else {}
+        if not isinstance(params, dict):
+            raise RPCError(INVALID_PARAMS, "Params must be an object")
+        try:
+            inspect.signature(function).bind(**params)
+        except TypeError as e:
+            raise RPCError(INVALID_PARAMS, str(e))
+        return await function(**params)
+
+    async def send(self, to, amount, message: str = None, **params):
+        """
+        Sends ``amount`` to ``to``, or each of the ``amount`` list to the
+        matching address of the ``to`` list.
+        """
+        async with self._sender(params.pop("from", None), params) as private_key:
+            if isinstance(to, list) or isinstance(amount, list):
+                if not isinstance(to, list) or not isinstance(amount, list):
+                    raise RPCError(
+                        INVALID_PARAMS, "'to' and 'amount' must both be lists"
+                    )
+                transaction = (
+                    await self.wallet_utils.create_transaction_to_send_multiple_wallet(
+                        private_key,
+                        to,
+                        [str(value) for value in amount],
+                        self.wallet_utils.string_to_bytes(message),
+                    )
+                )
+            else:
+                transaction = await self.wallet_utils.create_transaction(
+                    private_key,
+                    to,
+                    str(amount),
+                    self.wallet_utils.string_to_bytes(message),
+                )
+            return await self._push(transaction)
+
+    async def stake(self, amount, **params):
+        async with self._sender(params.pop("from", None), params) as private_key:
+            transaction = await self.wallet_utils.create_stake_transaction(
+                private_key, str(amount)
+            )
+            return await self._push(transaction)
+
+    async def unstake(self, **params):
+        async with self._sender(params.pop("from", None), params) as private_key:
+            transaction = await self.wallet_utils.create_unstake_transaction(
+                private_key
+            )
+            return await self._push(transaction)
+
+    async def register_inode(self, **params):
+        async with self._sender(params.pop("from", None), params) as private_key:
+            transaction = await self.wallet_utils.create_inode_registration_transaction(
+                private_key
+            )
+            return await self._push(transaction)
+
+    async def de_register_inode(self, **params):
+        async with self._sender(params.pop("from", None), params) as private_key:
+            transaction = (
+                await self.wallet_utils.create_inode_de_registration_transaction(
+                    private_key
+                )
+            )
+            return await self._push(transaction)
+
+    async def register_validator(self, **params):
+        async with self._sender(params.pop("from", None), params) as private_key:
+            transaction = (
+                await self.wallet_utils.create_validator_registration_transaction(
+                    private_key
+                )
+            )
+            return await self._push(transaction)
+
+    async def vote(self, range, to, **params):
+        async with self._sender(params.pop("from", None), params) as private_key:
+            transaction = await self.wallet_utils.create_voting_transaction(
+                private_key, str(range), to
+            )
+            return await self._push(transaction)
+
+    async def revoke(self, revoke_from, **params):
+        async with self._sender(params.pop("from", None), params) as private_key:
+            transaction = await self.wallet_utils.create_revoke_transaction(
+                private_key, revoke_from
+            )
+            return await self._push(transaction)
+
+    async def balance(self, address: str = None):
+        """
+        Returns the balance of ``address``, or of every address of the wallet.
+        """
+        addresses = (
+            [address]
+            if address is not None
+            else [key_pair.address for key_pair in self.keystore.iter_keys()]
+        )
+        balances = await asyncio.gather(
+            *(self.wallet_utils.get_balance_info(address) for address in addresses)
+        )
+        result = []
+        for address, balance_info in zip(addresses, balances):
+            balance, pending_balance, stake, pending_stake, is_error = balance_info
+            if is_error:
+                raise Exception(f"Could not get the balance of {address}")
+            result.append(
+                {
+                    "address": address,
+                    "balance": balance,
+                    "pending_balance": pending_balance,
+                    "stake": stake,
+                    "pending_stake": pending_stake,
+                }
+            )
+        return result
+
+    @asynccontextmanager
+    async def _sender(self, address: str, params: dict):
+        """
+        Yields the private key of ``address`` while holding the lock of that
+        address.
+        """
+        if params:
+            raise RPCError(
+                INVALID_PARAMS, f"Unexpected params: {', '.join(sorted(params))}"
+            )
+        if address is None:
+            if self.keystore.count() != 1:
+                raise RPCError(
+                    INVALID_PARAMS, "'from' is required when the wallet has many keys"
+                )
+            key_pair = self.keystore.get_by_index(0)
+        else:
+            key_pair = self.keystore.get_by_address(address)
+            if key_pair is None:
+                raise RPCError(INVALID_PARAMS, f"No key for address {address}")
+        async with self._locks[key_pair.address]:
+            yield key_pair.private_key
+
+    async def _push(self, transaction):
+        response = await self.wallet_utils.push_tx(transaction)
+        ok = bool(response.get("ok"))
+        return {
+            "tx_hash": transaction.hash(),
+            "ok": ok,
+            "error": None if ok else response.get("error", "rejected"),
+        }
+
+    @staticmethod
+    def _error(request_id, code: int, message: str):
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "error": {"code": code, "message": message},
+        }
@@ -0,0 +1,160 @@
+import json
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+from fastecdsa import keys
+from fastecdsa.point import Point
+
+from upow_transactions.constants import CURVE
+from upow_transactions.helpers import point_to_string
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS keys (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    private_key TEXT NOT NULL,
+    address TEXT NOT NULL UNIQUE,
+    public_key_x TEXT NOT NULL,
+    public_key_y TEXT NOT NULL
+);
+"""
+
+
+class KeyPair(NamedTuple):
+    private_key: int
+    address: str
+    public_key: Point
+
+
+def derive_key_record(private_key: int):
+    """
+    Derives the row stored for ``private_key``. Module level so it can run in
+    worker processes.
+    """
+    public_key = keys.get_public_key(private_key, CURVE)
+    return (
+        f"{private_key:064x}",
+        point_to_string(public_key),
+        f"{public_key.x:064x}",
+        f"{public_key.y:064x}",
+    )
+
+
+def generate_key_record(_=None):
+    return derive_key_record(keys.gen_private_key(CURVE))
+
+
+def generate_key_records(count: int, max_workers: int = None):
+    """
+    Generates ``count`` new keys and derives their records across a process
+    pool.
+    """
+    if count <= 1:
+        return [generate_key_record() for _ in range(count)]
+    max_workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers) as executor:
+        return list(
+            executor.map(
+                generate_key_record,
+                range(count),
+                chunksize=max(1, count // (max_workers * 4)),
+            )
+        )
+
+
+class KeyStore:
+    """
+    Append-only SQLite keystore.
+
+    Every key is stored with its derived address and public point, so keys can
+    be looked up by address or position and paged through without deriving
+    anything or loading the whole wallet.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+    def count(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM keys").fetchone()[0]
+
+    def add_key(self, private_key: int) -> KeyPair:
+        record = derive_key_record(private_key)
+        self.add_records([record])
+        return self._to_key_pair(record)
+
+    def add_records(self, records):
+        """
+        Appends already derived ``(private_key, address, x, y)`` records in a
+        single transaction.
+        """
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO keys (private_key, address, public_key_x, public_key_y) VALUES (?, ?, ?, ?)",
+                records,
+            )
+
+    def get_by_address(self, address: str):
+        row = self.connection.execute(
+            "SELECT private_key, address, public_key_x, public_key_y FROM keys WHERE address = ?",
+            (address,),
+        ).fetchone()
+        return self._to_key_pair(row) if row else None
+
+    def get_by_index(self, index: int):
+        if index < 0:
+            return None
+        row = self.connection.execute(
+            "SELECT private_key, address, public_key_x, public_key_y FROM keys ORDER BY id LIMIT 1 OFFSET ?",
+            (index,),
+        ).fetchone()
+        return self._to_key_pair(row) if row else None
+
+    def page(self, offset: int = 0, limit: int = 20):
+        return [
+            self._to_key_pair(row)
+            for row in self.connection.execute(
+                "SELECT private_key, address, public_key_x, public_key_y FROM keys ORDER BY id LIMIT ? OFFSET ?",
+                (limit, offset),
+            )
+        ]
+
+    def iter_keys(self, page_size: int = 1000):
+        last_id = 0
+        while True:
+            rows = self.connection.execute(
+                "SELECT id, private_key, address, public_key_x, public_key_y FROM keys WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, page_size),
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._to_key_pair(row[1:])
+            last_id = rows[-1][0]
+
+    def import_legacy(self, path: str) -> int:
+        """
+        Imports the keys of a pickledb ``key_pair_list.json`` file into an
+        empty keystore. Returns the number of imported keys.
+        """
+        if self.count() or not os.path.exists(path):
+            return 0
+        with open(path) as file:
+            key_list = json.load(file).get("keys") or []
+        self.add_records(
+            [derive_key_record(key_pair["private_key"]) for key_pair in key_list]
+        )
+        return len(key_list)
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def _to_key_pair(row) -> KeyPair:
+        private_key, address, x, y = row
+        return KeyPair(
+            int(private_key, 16), address, Point(int(x, 16), int(y, 16), CURVE)
+        )
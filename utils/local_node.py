@@ -0,0 +1,171 @@
+import asyncio
+import hashlib
+import json
+import random
+import time
+from typing import Dict, Tuple
+
+from upow_transactions.decoder import decode_transaction
+from upow_transactions.helpers import OutputType, from_smallest, to_smallest
+from utils import profiling
+
+# Where outputs of each type show up in get_address_info
+CATEGORIES = {
+    OutputType.REGULAR: "spendable_outputs",
+    OutputType.UN_STAKE: "spendable_outputs",
+    OutputType.STAKE: "stake_outputs",
+    OutputType.INODE_REGISTRATION: "inode_registration_outputs",
+    OutputType.VALIDATOR_REGISTRATION: "validator_registration_outputs",
+    OutputType.VOTE_AS_VALIDATOR: "delegate_spent_votes",
+    OutputType.VOTE_AS_DELEGATE: "delegate_spent_votes",
+    OutputType.VALIDATOR_VOTING_POWER: "validator_unspent_votes",
+    OutputType.DELEGATE_VOTING_POWER: "delegate_unspent_votes",
+}
+
+
+class LocalNode:
+    """
+    In-process stand-in for the node, for load tests and offline benchmarks.
+
+    Serves ``get_address_info``, ``dobby_info``, ``get_validators_info``,
+    ``get_delegates_info`` and ``push_tx`` from a synthetic UTXO set, after an
+    injected ``latency`` plus up to ``jitter`` seconds. It has the transport
+    interface, so it can be passed to ``Utils`` or ``WalletRepository``.
+
+    Pushed transactions are applied right away: their inputs must be unspent
+    outputs of the set and their outputs are added to it. Signatures are not
+    checked.
+    """
+
+    def __init__(self, latency: float = 0, jitter: float = 0, seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        # address -> {(tx_hash, index): (category, amount in the smallest unit)}
+        self.outputs: Dict[str, Dict[Tuple[str, int], Tuple[str, int]]] = {}
+        # (tx_hash, index) -> address
+        self.owners: Dict[Tuple[str, int], str] = {}
+        self.inodes = []
+        self.validators = []
+        self.delegates = []
+        self.inode_addresses = set()
+        self.validator_addresses = set()
+        self.pushed_transactions = []
+        self._pushed_hashes = set()
+
+    @classmethod
+    def synthetic(
+        cls,
+        addresses,
+        outputs_per_address: int,
+        amount="1",
+        latency: float = 0,
+        jitter: float = 0,
+        seed: int = None,
+    ):
+        node = cls(latency, jitter, seed)
+        for address in addresses:
+            node.add_outputs(address, [amount] * outputs_per_address)
+        return node
+
+    def add_outputs(self, address: str, amounts, category: str = "spendable_outputs"):
+        """
+        Adds one output per amount to ``address``, with made up transaction
+        hashes.
+        """
+        for amount in amounts:
+            tx_hash = hashlib.sha256(
+                f"{address}{len(self.owners)}".encode()
+            ).hexdigest()
+            self._add_output((tx_hash, 0), address, category, to_smallest(amount))
+
+    def _add_output(self, output, address: str, category: str, value: int):
+        self.outputs.setdefault(address, {})[output] = (category, value)
+        self.owners[output] = address
+
+    async def get(self, path: str, params: dict = None, timeout: float = None):
+        return await self.request("GET", path, params=params, timeout=timeout)
+
+    async def post(self, path: str, json: dict = None, timeout: float = None):
+        return await self.request("POST", path, json=json, timeout=timeout)
+
+    async def request(self, method: str, path: str, timeout: float = None, **kwargs):
+        start = time.perf_counter()
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        payload = kwargs.get("params") if method == "GET" else kwargs.get("json")
+        payload = payload or {}
+        response = self._handle(path.lstrip("/"), payload)
+        if profiling.active():
+            profiling.record_request(
+                method,
+                path,
+                len(json.dumps(payload)),
+                len(json.dumps(response)),
+                time.perf_counter() - start,
+            )
+        return response
+
+    def _handle(self, path: str, payload: dict):
+        if path == "get_address_info":
+            return {"ok": True, "result": self.address_info(payload["address"])}
+        elif path == "dobby_info":
+            return {"ok": True, "result": list(self.inodes)}
+        elif path == "get_validators_info":
+            return list(self.validators)
+        elif path == "get_delegates_info":
+            return list(self.delegates)
+        elif path == "push_tx":
+            return self.push_tx(payload["tx_hex"])
+        raise Exception(f"Unknown endpoint: {path}")
+
+    def address_info(self, address: str) -> dict:
+        result = {category: [] for category in dict.fromkeys(CATEGORIES.values())}
+        totals = dict.fromkeys(result, 0)
+        for (tx_hash, index), (category, value) in self.outputs.get(
+            address, {}
+        ).items():
+            result[category].append(
+                {
+                    "tx_hash": tx_hash,
+                    "index": index,
+                    "amount": str(from_smallest(value)),
+                }
+            )
+            totals[category] += value
+        result["balance"] = str(from_smallest(totals["spendable_outputs"]))
+        result["stake"] = str(from_smallest(totals["stake_outputs"]))
+        result["pending_spent_outputs"] = []
+        result["pending_transactions"] = []
+        result["is_inode"] = address in self.inode_addresses
+        result["is_validator"] = address in self.validator_addresses
+        return result
+
+    def push_tx(self, tx_hex: str) -> dict:
+        try:
+            transaction = decode_transaction(bytes.fromhex(tx_hex))
+        except Exception as e:
+            return {"ok": False, "error": f"Could not decode transaction: {e}"}
+        if transaction.hash() in self._pushed_hashes:
+            return {"ok": False, "error": "Transaction just added"}
+        spent = [(tx_input.tx_hash, tx_input.index) for tx_input in transaction.inputs]
+        missing = [output for output in spent if output not in self.owners]
+        if missing or len(set(spent)) != len(spent):
+            return {"ok": False, "error": f"Unknown or spent inputs {missing}"}
+        for output in spent:
+            del self.outputs[self.owners.pop(output)][output]
+        tx_hash = transaction.hash()
+        for index, tx_output in enumerate(transaction.outputs):
+            self._add_output(
+                (tx_hash, index),
+                tx_output.address,
+                CATEGORIES.get(tx_output.output_type, "spendable_outputs"),
+                tx_output.amount,
+            )
+        self.pushed_transactions.append(tx_hash)
+        self._pushed_hashes.add(tx_hash)
+        return {"ok": True, "result": "Transaction has been accepted"}
+
+    def close(self):
+        pass
@@ -0,0 +1,220 @@
+import json
+import sqlite3
+import time
+
+from upow_transactions.helpers import OutputType, from_smallest
+
+# Output types that can be spent as regular inputs
+SPENDABLE_TYPES = {OutputType.REGULAR, OutputType.UN_STAKE}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS local_transactions (
+    tx_hash TEXT PRIMARY KEY,
+    parents TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS local_outputs (
+    tx_hash TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    address TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    PRIMARY KEY (tx_hash, idx)
+);
+CREATE INDEX IF NOT EXISTS local_outputs_address ON local_outputs (address);
+"""
+
+
+class Mempool:
+    """
+    Local record of the transactions we signed that the node has not
+    confirmed yet.
+
+    The spendable outputs these transactions create, change included, are
+    added to the ``spendable_outputs`` of ``get_address_info`` results, so
+    they can be spent right away instead of after the next block. The depth
+    of a transaction is the length of its chain of unconfirmed ancestors,
+    itself included; outputs of transactions at ``max_depth`` are not offered,
+    and ``max_depth=0`` disables chaining.
+
+    A transaction is dropped once one of its outputs is reported by the node,
+    together with its ancestors, when the node rejects it, or ``ttl`` seconds
+    after it was signed.
+    """
+
+    def __init__(self, path: str = ":memory:", max_depth: int = 25, ttl: float = 600):
+        self.path = path
+        self.max_depth = max_depth
+        self.ttl = ttl
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def depth(self, tx_hash: str, _parents: dict = None) -> int:
+        """
+        Returns the depth of ``tx_hash``, 0 when it is not a local transaction.
+        """
+        parents = _parents if _parents is not None else self._parents()
+        depths = {}
+
+        def depth(tx_hash):
+            if tx_hash not in parents:
+                return 0
+            if tx_hash not in depths:
+                depths[tx_hash] = 1 + max(
+                    (depth(parent) for parent in parents[tx_hash]), default=0
+                )
+            return depths[tx_hash]
+
+        return depth(tx_hash)
+
+    def add(self, transaction) -> int:
+        """
+        Records a signed ``transaction`` and its spendable outputs, removes the
+        local outputs it spends and returns its depth.
+        """
+        tx_hash = transaction.hash()
+        parents = self._parents()
+        local_parents = sorted(
+            {
+                tx_input.tx_hash
+                for tx_input in transaction.inputs
+                if tx_input.tx_hash in parents
+            }
+        )
+        depth = 1 + max(
+            (self.depth(parent, parents) for parent in local_parents), default=0
+        )
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO local_transactions (tx_hash, parents, created_at) VALUES (?, ?, ?)",
+                (tx_hash, json.dumps(local_parents), time.time()),
+            )
+            self.connection.executemany(
+                "DELETE FROM local_outputs WHERE tx_hash = ? AND idx = ?",
+                [(tx_input.tx_hash, tx_input.index) for tx_input in transaction.inputs],
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO local_outputs (tx_hash, idx, address, amount) VALUES (?, ?, ?, ?)",
+                [
+                    (tx_hash, index, tx_output.address, tx_output.value)
+                    for index, tx_output in enumerate(transaction.outputs)
+                    if tx_output.transaction_type in SPENDABLE_TYPES
+                ],
+            )
+        return depth
+
+    def has(self, tx_hash: str) -> bool:
+        return (
+            self.connection.execute(
+                "SELECT 1 FROM local_transactions WHERE tx_hash = ?", (tx_hash,)
+            ).fetchone()
+            is not None
+        )
+
+    def remove(self, tx_hash: str):
+        """
+        Forgets a transaction the node did not accept, along with the local
+        transactions spending its outputs.
+        """
+        parents = self._parents()
+        removed = {tx_hash}
+        changed = True
+        while changed:
+            children = {
+                child
+                for child, child_parents in parents.items()
+                if child not in removed and removed.intersection(child_parents)
+            }
+            changed = bool(children)
+            removed |= children
+        self._delete(removed)
+
+    def confirm(self, tx_hash: str):
+        """
+        Forgets a transaction known to the node, along with its ancestors.
+        """
+        parents = self._parents()
+        confirmed = set()
+        stack = [tx_hash]
+        while stack:
+            current = stack.pop()
+            if current in parents and current not in confirmed:
+                confirmed.add(current)
+                stack.extend(parents[current])
+        self._delete(confirmed)
+
+    def merge(self, address: str, result: dict) -> dict:
+        """
+        Returns a copy of the ``get_address_info`` ``result`` of ``address``
+        with the local outputs of ``address`` added to its spendable outputs.
+        """
+        self._expire()
+        parents = self._parents()
+        if not parents:
+            return result
+        reported = {
+            output["tx_hash"] for output in result.get("spendable_outputs") or []
+        }
+        confirmed = reported.intersection(parents)
+        for tx_hash in confirmed:
+            self.confirm(tx_hash)
+        if confirmed:
+            parents = self._parents()
+
+        local_outputs = self.connection.execute(
+            "SELECT tx_hash, idx, amount FROM local_outputs WHERE address = ?",
+            (address,),
+        ).fetchall()
+        if not local_outputs:
+            return result
+        pending_spent_outputs = {
+            (output["tx_hash"], output["index"])
+            for output in result.get("pending_spent_outputs") or []
+        }
+        spendable_outputs = list(result.get("spendable_outputs") or [])
+        for tx_hash, index, amount in local_outputs:
+            if (
+                tx_hash in parents
+                and (tx_hash, index) not in pending_spent_outputs
+                and self.depth(tx_hash, parents) < self.max_depth
+            ):
+                spendable_outputs.append(
+                    {
+                        "tx_hash": tx_hash,
+                        "index": index,
+                        "amount": str(from_smallest(amount)),
+                    }
+                )
+        return {**result, "spendable_outputs": spendable_outputs}
+
+    def close(self):
+        self.connection.close()
+
+    def _parents(self) -> dict:
+        return {
+            tx_hash: json.loads(parents)
+            for tx_hash, parents in self.connection.execute(
+                "SELECT tx_hash, parents FROM local_transactions"
+            )
+        }
+
+    def _expire(self):
+        expired = [
+            tx_hash
+            for (tx_hash,) in self.connection.execute(
+                "SELECT tx_hash FROM local_transactions WHERE created_at < ?",
+                (time.time() - self.ttl,),
+            )
+        ]
+        if expired:
+            self._delete(expired)
+
+    def _delete(self, tx_hashes):
+        with self.connection:
+            self.connection.executemany(
+                "DELETE FROM local_transactions WHERE tx_hash = ?",
+                [(tx_hash,) for tx_hash in tx_hashes],
+            )
+            self.connection.executemany(
+                "DELETE FROM local_outputs WHERE tx_hash = ?",
+                [(tx_hash,) for tx_hash in tx_hashes],
+            )
@@ -0,0 +1,133 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+
+class Profiler:
+    """
+    Collects the time spent in each named stage of a run and the requests
+    sent to the node, optionally along with cProfile and tracemalloc data.
+
+    Stages of concurrent tasks overlap, so their times add up to more than
+    the run's wall time when requests run in parallel.
+    """
+
+    def __init__(self, cpu: bool = False, memory: bool = False) -> None:
+        self.cpu = cpu
+        self.memory = memory
+        self.stages = {}
+        self.requests = {}
+        self.started_at = None
+        self.seconds = None
+        self._start = None
+        self._cprofile = None
+
+    def start(self):
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        if self.memory:
+            tracemalloc.start()
+        if self.cpu:
+            import cProfile
+
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop(self):
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        self.seconds = time.perf_counter() - self._start
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stage = self.stages.setdefault(name, {"count": 0, "seconds": 0.0})
+            stage["count"] += 1
+            stage["seconds"] += time.perf_counter() - start
+
+    def record_request(
+        self, method: str, path: str, sent: int, received: int, seconds: float
+    ):
+        request = self.requests.setdefault(
+            f"{method} {path.lstrip('/')}",
+            {"count": 0, "sent_bytes": 0, "received_bytes": 0, "seconds": 0.0},
+        )
+        request["count"] += 1
+        request["sent_bytes"] += sent
+        request["received_bytes"] += received
+        request["seconds"] += seconds
+
+    def report(self, **info) -> dict:
+        report = {
+            **info,
+            "started_at": self.started_at,
+            "seconds": self.seconds,
+            "stages": self.stages,
+            "requests": {
+                "count": sum(request["count"] for request in self.requests.values()),
+                "sent_bytes": sum(
+                    request["sent_bytes"] for request in self.requests.values()
+                ),
+                "received_bytes": sum(
+                    request["received_bytes"] for request in self.requests.values()
+                ),
+                "endpoints": self.requests,
+            },
+        }
+        if self._cprofile is not None:
+            import io
+            import pstats
+
+            output = io.StringIO()
+            stats = pstats.Stats(self._cprofile, stream=output)
+            stats.sort_stats("cumulative").print_stats(40)
+            report["cprofile"] = output.getvalue()
+        if self.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            report["tracemalloc"] = {
+                "current_bytes": current,
+                "peak_bytes": peak,
+                "top": [
+                    {"location": str(stat.traceback), "size": stat.size}
+                    for stat in tracemalloc.take_snapshot().statistics("lineno")[:20]
+                ],
+            }
+            tracemalloc.stop()
+        return report
+
+    def write(self, path: str, **info):
+        with open(path, "w") as file:
+            json.dump(self.report(**info), file, indent=2)
+
+
+_profiler: Profiler = None
+
+
+def enable(profiler: Profiler):
+    global _profiler
+    _profiler = profiler
+
+
+def disable():
+    global _profiler
+    _profiler = None
+
+
+def active() -> bool:
+    return _profiler is not None
+
+
+def stage(name: str):
+    """
+    Times the enclosed block as ``name`` when profiling is enabled.
+    """
+    return _profiler.stage(name) if _profiler is not None else nullcontext()
+
+
+def record_request(method: str, path: str, sent: int, received: int, seconds: float):
+    if _profiler is not None:
+        _profiler.record_request(method, path, sent, received, seconds)
@@ -0,0 +1,239 @@
+import asyncio
+import random
+import time
+from typing import NamedTuple
+
+import requests
+
+from upow_transactions.helpers import sha256
+from utils import profiling
+
+# HTTP statuses worth another attempt, on top of every 5xx
+RETRY_STATUSES = {408, 425, 429}
+# Errors of the node for a transaction it already holds
+ALREADY_KNOWN_ERRORS = ("just added", "already")
+
+
+class PushResult(NamedTuple):
+    index: int
+    tx_hash: str
+    ok: bool
+    attempts: int
+    error: str = None
+    response: dict = None
+    seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return self._asdict()
+
+
+def _retry_after(error: Exception):
+    """
+    Returns the delay asked for by the node in a ``Retry-After`` header, in
+    seconds, if any.
+    """
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, requests.HTTPError):
+        response = error.response
+        return response is not None and (
+            response.status_code in RETRY_STATUSES or response.status_code >= 500
+        )
+    return isinstance(
+        error, (requests.ConnectionError, requests.Timeout, asyncio.TimeoutError)
+    )
+
+
+def is_rejection(error: Exception) -> bool:
+    """
+    Tells whether a failed push was refused by the node, a ``4xx`` answer,
+    rather than of unknown outcome, such as a timeout after which the node may
+    hold the transaction.
+    """
+    response = getattr(error, "response", None)
+    return (
+        isinstance(error, requests.HTTPError)
+        and response is not None
+        and 400 <= response.status_code < 500
+    )
+
+
+def is_already_known(response) -> bool:
+    if not isinstance(response, dict):
+        return False
+    error = str(response.get("error", "")).lower()
+    return any(message in error for message in ALREADY_KNOWN_ERRORS)
+
+
+class PushPipeline:
+    """
+    Pushes a stream of signed transactions to the node concurrently.
+
+    At most ``max_in_flight`` transactions are pushed at once. Connection
+    errors, timeouts, ``429`` and ``5xx`` responses are retried up to
+    ``max_attempts`` times with full jitter exponential backoff, and a
+    ``Retry-After`` header pauses every push until it has passed. ``rate``
+    caps the number of pushes started per second. A transaction rejected by
+    the node is not retried, and one the node reports as already known after
+    a retry counts as pushed.
+
+    A transaction is only removed from the local records, see
+    ``WalletRepository.forget_transaction``, once the node rejected it. When
+    the outcome stays unknown the records are kept, as the node may hold it.
+    """
+
+    def __init__(
+        self,
+        repo,
+        max_in_flight: int = 8,
+        max_attempts: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30,
+        rate: float = None,
+        seed: int = None,
+    ) -> None:
+        if max_in_flight < 1:
+            raise Exception("max_in_flight must be at least 1")
+        if max_attempts < 1:
+            raise Exception("max_attempts must be at least 1")
+        self.repo = repo
+        self.max_in_flight = max_in_flight
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rate = rate
+        self.random = random.Random(seed)
+        self._not_before = 0.0
+        self._next_start = 0.0
+
+    def backoff(self, attempt: int) -> float:
+        return self.random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    async def _wait_turn(self):
+        """
+        Waits for a pause asked by the node to pass and for the next slot
+        allowed by ``rate``.
+        """
+        now = time.monotonic()
+        start = max(now, self._not_before)
+        if self.rate:
+            start = max(start, self._next_start)
+            self._next_start = start + 1 / self.rate
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def push(self, transaction, index: int = 0) -> PushResult:
+        tx_hex = transaction.hex()
+        tx_hash = sha256(tx_hex)
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            attempt += 1
+            await self._wait_turn()
+            try:
+                with profiling.stage("push"):
+                    response = await self.repo.transport.post(
+                        "push_tx", json={"tx_hex": tx_hex}
+                    )
+            except Exception as e:
+                if not is_transient(e) or attempt >= self.max_attempts:
+                    if is_rejection(e):
+                        self.repo.forget_transaction(transaction)
+                    return PushResult(
+                        index,
+                        tx_hash,
+                        False,
+                        attempt,
+                        error=str(e) or type(e).__name__,
+                        seconds=time.perf_counter() - start,
+                    )
+                retry_after = _retry_after(e)
+                if retry_after is not None:
+                    self._not_before = max(
+                        self._not_before, time.monotonic() + retry_after
+                    )
+                await asyncio.sleep(self.backoff(attempt - 1))
+                continue
+            ok = isinstance(response, dict) and bool(response.get("ok"))
+            if not ok and attempt > 1 and is_already_known(response):
+                # An earlier attempt reached the node before timing out
+                ok = True
+            error = None
+            if ok:
+                self.repo.ensure_recorded(transaction)
+            elif not is_already_known(response):
+                self.repo.forget_transaction(transaction)
+            if not ok:
+                error = str(
+                    response.get("error", "rejected")
+                    if isinstance(response, dict)
+                    else response
+                )
+            return PushResult(
+                index,
+                tx_hash,
+                ok,
+                attempt,
+                error=error,
+                response=response,
+                seconds=time.perf_counter() - start,
+            )
+
+    async def run(self, transactions):
+        """
+        Pushes ``transactions``, an iterable or async iterable, and yields a
+        ``PushResult`` for each one as soon as it is done, so results may come
+        out of order. Transactions are only pulled from the source when a slot
+        is free.
+        """
+        if hasattr(transactions, "__aiter__"):
+            source = transactions.__aiter__()
+            next_transaction = source.__anext__
+        else:
+            source = iter(transactions)
+
+            async def next_transaction():
+                try:
+                    return next(source)
+                except StopIteration:
+                    raise StopAsyncIteration
+
+        pending = set()
+        index = 0
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < self.max_in_flight:
+                    try:
+                        transaction = await next_transaction()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    pending.add(asyncio.create_task(self.push(transaction, index)))
+                    index += 1
+                if not pending:
+                    return
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def push_all(self, transactions):
+        """
+        Pushes ``transactions`` and returns their results in input order.
+        """
+        results = [result async for result in self.run(transactions)]
+        return sorted(results, key=lambda result: result.index)
@@ -1,17 +1,37 @@
 import logging
-from decimal import Decimal
 
 import requests
 
-from upow_transactions.helpers import string_to_point, round_up_decimal
+from upow_transactions.decoder import decode_transaction
+from upow_transactions.helpers import (
+    from_smallest,
+    round_to_smallest,
+    string_to_point,
+    to_smallest,
+)
 from upow_transactions.transaction_input import TransactionInput
+from utils import profiling
+from utils.address_state import AddressState
+from utils.mempool import Mempool
+from utils.push_pipeline import is_already_known, is_rejection
+from utils.transport import NodeTransport
+from utils.utxo_store import UTXOStore
 
 
 class WalletRepository:
-    def __init__(self, node_url: str) -> None:
+    def __init__(
+        self,
+        node_url: str,
+        transport: NodeTransport = None,
+        utxo_store: UTXOStore = None,
+        mempool: Mempool = None,
+    ) -> None:
         self.node_url = node_url
+        self.transport = transport or NodeTransport(node_url)
+        self.utxo_store = utxo_store
+        self.mempool = mempool
 
-    def get_address_info(
+    async def get_address_info(
         self,
         address: str,
         stake_outputs: bool = False,
@@ -21,36 +41,91 @@ class WalletRepository:
         inode_registration_outputs: bool = False,
         validator_unspent_votes: bool = False,
     ):
-        request = requests.get(
-            f"{self.node_url}/get_address_info",
-            {
-                "address": address,
-                "transactions_count_limit": 0,
-                "show_pending": True,
-                "stake_outputs": stake_outputs,
-                "delegate_spent_votes": delegate_spent_votes,
-                "delegate_unspent_votes": delegate_unspent_votes,
-                "address_state": address_state,
-                "inode_registration_outputs": inode_registration_outputs,
-                "validator_unspent_votes": validator_unspent_votes,
-            },
-        )
-        request.raise_for_status()
-        result = request.json()["result"]
+        flags = {
+            "stake_outputs": stake_outputs,
+            "delegate_spent_votes": delegate_spent_votes,
+            "delegate_unspent_votes": delegate_unspent_votes,
+            "address_state": address_state,
+            "inode_registration_outputs": inode_registration_outputs,
+            "validator_unspent_votes": validator_unspent_votes,
+        }
+        fields = [field for field, enabled in flags.items() if enabled]
+        if self.utxo_store is not None:
+            with profiling.stage("utxo_cache"):
+                result = self.utxo_store.get(address, fields)
+            if result is not None:
+                return self._merge_mempool(address, result)
+
+        with profiling.stage("fetch"):
+            response = await self.transport.get(
+                "get_address_info",
+                {
+                    "address": address,
+                    "transactions_count_limit": 0,
+                    "show_pending": True,
+                    **flags,
+                },
+            )
+        result = response["result"]
 
-        return result
+        if self.utxo_store is not None:
+            with profiling.stage("utxo_cache"):
+                result = self.utxo_store.refresh(address, fields, result)
+        return self._merge_mempool(address, result)
+
+    def _merge_mempool(self, address: str, result: dict):
+        if self.mempool is None:
+            return result
+        with profiling.stage("mempool"):
+            return self.mempool.merge(address, result)
+
+    def mark_spent(self, tx_inputs):
+        if self.utxo_store is not None:
+            self.utxo_store.mark_spent(tx_inputs)
 
-    def get_dobby_info(self):
-        request = requests.get(f"{self.node_url}/dobby_info")
-        request.raise_for_status()
-        result = request.json()["result"]
+    def unmark_spent(self, tx_inputs):
+        if self.utxo_store is not None:
+            self.utxo_store.unmark_spent(tx_inputs)
+
+    def forget_transaction(self, transaction):
+        """
+        Undoes ``record_transaction`` for a transaction that did not reach the
+        node, so the outputs it spends can be selected again and its change is
+        no longer offered.
+        """
+        self.unmark_spent(transaction.inputs)
+        if self.mempool is not None:
+            self.mempool.remove(transaction.hash())
+
+    def record_transaction(self, transaction):
+        """
+        Marks the outputs spent by a signed ``transaction`` and adds it to the
+        local mempool, so its change can be spent before it is confirmed.
+        """
+        self.mark_spent(transaction.inputs)
+        if self.mempool is not None:
+            self.mempool.add(transaction)
+
+    def ensure_recorded(self, transaction):
+        """
+        Records a pushed ``transaction`` again if it left the local mempool
+        while it was being pushed, e.g. when its TTL ran out during retries.
+        """
+        if self.mempool is not None and not self.mempool.has(transaction.hash()):
+            self.record_transaction(transaction)
+        else:
+            self.mark_spent(transaction.inputs)
+
+    async def get_dobby_info(self):
+        with profiling.stage("fetch"):
+            response = await self.transport.get("dobby_info")
+        result = response["result"]
         return result
 
-    def get_validators_info(self, inode: str = None):
+    async def get_validators_info(self, inode: str = None):
         params = {"inode": inode} if inode else {}
-        request = requests.get(f"{self.node_url}/get_validators_info", params)
-        request.raise_for_status()
-        result = request.json()
+        with profiling.stage("fetch"):
+            result = await self.transport.get("get_validators_info", params)
         return result
 
     def get_inode_ballot_input_by_address_from_json(
@@ -64,10 +139,11 @@ class WalletRepository:
         if pending_spent_outputs is None:
             pending_spent_outputs = []
         pending_spent_outputs = (
-            [(output["tx_hash"], output["index"]) for output in pending_spent_outputs]
+            {(output["tx_hash"], output["index"]) for output in pending_spent_outputs}
             if check_pending_txs is True
-            else []
+            else set()
         )
+        public_key = string_to_point(address)
         inode_ballot_inputs = []
         for validator_info in json:
             if validator_info["validator"] == address:
@@ -82,18 +158,37 @@ class WalletRepository:
                     tx_input = TransactionInput(
                         validator_voted_for["tx_hash"], validator_voted_for["index"]
                     )
-                    tx_input.amount = Decimal(str(validator_voted_for["vote_count"]))
-                    tx_input.public_key = string_to_point(address)
+                    tx_input.value = round_to_smallest(
+                        validator_voted_for["vote_count"]
+                    )
+                    tx_input.public_key = public_key
                     inode_ballot_inputs.append(tx_input)
         return inode_ballot_inputs
 
-    def get_delegates_info(self, validator: str = None):
+    async def get_delegates_info(self, validator: str = None):
         params = {"validator": validator} if validator else {}
-        request = requests.get(f"{self.node_url}/get_delegates_info", params)
-        request.raise_for_status()
-        result = request.json()
+        with profiling.stage("fetch"):
+            result = await self.transport.get("get_delegates_info", params)
         return result
 
+    async def push_tx(self, tx_hex: str):
+        """
+        Pushes a signed transaction. When the node rejects it, the outputs it
+        spends are released so they can be selected again. When the outcome is
+        unknown, e.g. after a timeout, the node may hold it, so it stays
+        recorded until the node's pending outputs or the TTLs clear it.
+        """
+        try:
+            with profiling.stage("push"):
+                response = await self.transport.post("push_tx", json={"tx_hex": tx_hex})
+        except Exception as e:
+            if is_rejection(e):
+                self.forget_transaction(decode_transaction(bytes.fromhex(tx_hex)))
+            raise
+        if not response.get("ok") and not is_already_known(response):
+            self.forget_transaction(decode_transaction(bytes.fromhex(tx_hex)))
+        return response
+
     def get_validator_ballot_input_by_address_from_json(
         self,
         json,
@@ -105,10 +200,11 @@ class WalletRepository:
         if pending_spent_outputs is None:
             pending_spent_outputs = []
         pending_spent_outputs = (
-            [(output["tx_hash"], output["index"]) for output in pending_spent_outputs]
+            {(output["tx_hash"], output["index"]) for output in pending_spent_outputs}
             if check_pending_txs is True
-            else []
+            else set()
         )
+        public_key = string_to_point(address)
         validator_ballot_inputs = []
         for delegate_info in json:
             if delegate_info["delegate"] == address:
@@ -123,78 +219,35 @@ class WalletRepository:
                     tx_input = TransactionInput(
                         delegate_voted_for["tx_hash"], delegate_voted_for["index"]
                     )
-                    tx_input.amount = Decimal(str(delegate_voted_for["vote_count"]))
-                    tx_input.public_key = string_to_point(address)
+                    tx_input.value = round_to_smallest(delegate_voted_for["vote_count"])
+                    tx_input.public_key = public_key
                     validator_ballot_inputs.append(tx_input)
         return validator_ballot_inputs
 
+    def parse_address_info(self, result, address: str = None) -> AddressState:
+        """
+        Parses a get_address_info result once so the ``*_from_json`` helpers
+        can share it. Passing an already parsed AddressState returns it as is.
+        """
+        if isinstance(result, AddressState):
+            return result
+        return AddressState(result, address)
+
     def get_address_input_from_json(self, result, address):
-        pending_spent_outputs = [
-            (output["tx_hash"], output["index"])
-            for output in result["pending_spent_outputs"]
-        ]
-        tx_inputs = []
-        for spendable_tx_input in result["spendable_outputs"]:
-            if (
-                spendable_tx_input["tx_hash"],
-                spendable_tx_input["index"],
-            ) in pending_spent_outputs:
-                continue
-            tx_input = TransactionInput(
-                spendable_tx_input["tx_hash"], spendable_tx_input["index"]
-            )
-            tx_input.amount = Decimal(str(spendable_tx_input["amount"]))
-            tx_input.public_key = string_to_point(address)
-            tx_inputs.append(tx_input)
-        return tx_inputs
+        return self.parse_address_info(result, address).get_address_inputs()
+
+    def get_address_utxo_table_from_json(self, result, address):
+        return self.parse_address_info(result, address).get_utxo_table()
 
     def get_stake_input_from_json(
         self, result, address, check_pending_txs: bool = True
     ):
-        pending_spent_outputs = (
-            [
-                (output["tx_hash"], output["index"])
-                for output in result["pending_spent_outputs"]
-            ]
-            if check_pending_txs is True
-            else []
+        return self.parse_address_info(result, address).get_stake_inputs(
+            check_pending_txs
         )
-        stake_tx_input = []
-        if result["stake_outputs"]:
-            for stake_tx_output in result["stake_outputs"]:
-                if (
-                    stake_tx_output["tx_hash"],
-                    stake_tx_output["index"],
-                ) in pending_spent_outputs:
-                    continue
-                tx_input = TransactionInput(
-                    stake_tx_output["tx_hash"], stake_tx_output["index"]
-                )
-                tx_input.amount = Decimal(str(stake_tx_output["amount"]))
-                tx_input.public_key = string_to_point(address)
-                stake_tx_input.append(tx_input)
-        return stake_tx_input
 
     def get_inode_registration_input_from_json(self, json, address):
-        pending_spent_outputs = [
-            (output["tx_hash"], output["index"])
-            for output in json["pending_spent_outputs"]
-        ]
-        inode_registration_input = []
-        if json["inode_registration_outputs"]:
-            for inode_reg_output in json["inode_registration_outputs"]:
-                if (
-                    inode_reg_output["tx_hash"],
-                    inode_reg_output["index"],
-                ) in pending_spent_outputs:
-                    continue
-                tx_input = TransactionInput(
-                    inode_reg_output["tx_hash"], inode_reg_output["index"]
-                )
-                tx_input.amount = Decimal(str(inode_reg_output["amount"]))
-                tx_input.public_key = string_to_point(address)
-                inode_registration_input.append(tx_input)
-        return inode_registration_input
+        return self.parse_address_info(json, address).get_inode_registration_inputs()
 
     def get_delegate_spent_votes_from_json(self, json, check_pending_txs: bool = True):
         """
@@ -204,28 +257,7 @@ class WalletRepository:
         :param json: Json data of address_info
         :return: The delegate_spent_votes in List[TransactionInput] of the account.
         """
-        pending_spent_outputs = (
-            [
-                (output["tx_hash"], output["index"])
-                for output in json["pending_spent_outputs"]
-            ]
-            if check_pending_txs is True
-            else []
-        )
-        delegate_vote_tx_input = []
-        if json["delegate_spent_votes"]:
-            for delegate_spent_vote in json["delegate_spent_votes"]:
-                if (
-                    delegate_spent_vote["tx_hash"],
-                    delegate_spent_vote["index"],
-                ) in pending_spent_outputs:
-                    continue
-                tx_input = TransactionInput(
-                    delegate_spent_vote["tx_hash"], delegate_spent_vote["index"]
-                )
-                tx_input.amount = Decimal(str(delegate_spent_vote["amount"]))
-                delegate_vote_tx_input.append(tx_input)
-        return delegate_vote_tx_input
+        return self.parse_address_info(json).get_delegate_spent_votes(check_pending_txs)
 
     def get_delegate_unspent_votes_from_json(
         self, json, address: str = None, check_pending_txs: bool = True
@@ -238,29 +270,9 @@ class WalletRepository:
         :param json: Json data of address_info
         :return: The delegate_unspent_votes in List[TransactionInput] of the account.
         """
-        pending_spent_outputs = (
-            [
-                (output["tx_hash"], output["index"])
-                for output in json["pending_spent_outputs"]
-            ]
-            if check_pending_txs is True
-            else []
+        return self.parse_address_info(json, address).get_delegate_unspent_votes(
+            check_pending_txs
         )
-        delegate_vote_tx_input = []
-        if json["delegate_unspent_votes"]:
-            for delegate_unspent_votes in json["delegate_unspent_votes"]:
-                if (
-                    delegate_unspent_votes["tx_hash"],
-                    delegate_unspent_votes["index"],
-                ) in pending_spent_outputs:
-                    continue
-                tx_input = TransactionInput(
-                    delegate_unspent_votes["tx_hash"], delegate_unspent_votes["index"]
-                )
-                tx_input.amount = Decimal(str(delegate_unspent_votes["amount"]))
-                tx_input.public_key = string_to_point(address) if address else None
-                delegate_vote_tx_input.append(tx_input)
-        return delegate_vote_tx_input
 
     def get_validator_unspent_votes_from_json(
         self, json, address, check_pending_txs: bool = True
@@ -273,56 +285,30 @@ class WalletRepository:
         :param json: Json data of address_info
         :return: The validator_unspent_votes in List[TransactionInput] of the account.
         """
-        pending_spent_outputs = (
-            [
-                (output["tx_hash"], output["index"])
-                for output in json["pending_spent_outputs"]
-            ]
-            if check_pending_txs is True
-            else []
+        return self.parse_address_info(json, address).get_validator_unspent_votes(
+            check_pending_txs
         )
-        validator_vote_tx_input = []
-        if json["validator_unspent_votes"]:
-            for validator_unspent_votes in json["validator_unspent_votes"]:
-                if (
-                    validator_unspent_votes["tx_hash"],
-                    validator_unspent_votes["index"],
-                ) in pending_spent_outputs:
-                    continue
-                tx_input = TransactionInput(
-                    validator_unspent_votes["tx_hash"], validator_unspent_votes["index"]
-                )
-                tx_input.amount = Decimal(str(validator_unspent_votes["amount"]))
-                tx_input.public_key = string_to_point(address)
-                validator_vote_tx_input.append(tx_input)
-        return validator_vote_tx_input
 
     def get_delegates_all_power(self, json):
-        delegates_unspent_votes = self.get_delegate_unspent_votes_from_json(
-            json, check_pending_txs=False
+        address_state = self.parse_address_info(json)
+        delegates_unspent_votes = address_state.get_delegate_unspent_votes(
+            check_pending_txs=False
         )
-        delegates_spent_votes = self.get_delegate_spent_votes_from_json(
-            json, check_pending_txs=False
+        delegates_spent_votes = address_state.get_delegate_spent_votes(
+            check_pending_txs=False
         )
         delegates_unspent_votes.extend(delegates_spent_votes)
-        assert (
-            sum(delegate_votes.amount for delegate_votes in delegates_unspent_votes)
-            <= 10
-        )
+        assert sum(
+            delegate_votes.value for delegate_votes in delegates_unspent_votes
+        ) <= to_smallest(10)
         return delegates_unspent_votes
 
     def get_pending_vote_as_delegate_transaction_from_json(self, address, json):
-        pending_transactions = json["pending_transactions"]
-        pending_vote_as_delegate_transaction = []
-        for tx in pending_transactions:
-            if (
-                tx["transaction_type"] == "VOTE_AS_DELEGATE"
-                and tx["inputs"][0]["address"] == address
-            ):
-                pending_vote_as_delegate_transaction.append(tx)
-        return pending_vote_as_delegate_transaction
-
-    def get_balance_info(self, address: str):
+        return self.parse_address_info(json, address).get_pending_transactions(
+            "VOTE_AS_DELEGATE", address
+        )
+
+    async def get_balance_info(self, address: str):
         """
         Fetches the account data from the node and calculates the pending balance.
 
@@ -332,13 +318,12 @@ class WalletRepository:
         """
         try:
             # Send the request to the node
-            request = requests.get(
-                f"{self.node_url}/get_address_info",
-                params={"address": address, "show_pending": True},
-            )
-            request.raise_for_status()  # Raises an HTTPError if the HTTP request returned an unsuccessful status code
-
-            response = request.json()
+            # Raises an HTTPError if the HTTP request returned an unsuccessful status code
+            with profiling.stage("fetch"):
+                response = await self.transport.get(
+                    "get_address_info",
+                    params={"address": address, "show_pending": True},
+                )
             result = response.get("result")
 
             if not response.get("ok"):
@@ -356,11 +341,11 @@ class WalletRepository:
             # Create a set of spendable transaction hashes for easy lookup
             spendable_hashes = {output["tx_hash"] for output in spendable_outputs}
 
-            # Ensure the balance is a string before converting to Decimal
-            total_balance = Decimal(str(result["balance"]))
-            pending_balance = Decimal("0")
-            stake_balance = Decimal(str(result["stake"]))
-            pending_stake_balance = Decimal("0")
+            # Sum in the smallest unit and only convert back to Decimal at the end
+            total_balance = round_to_smallest(result["balance"])
+            pending_balance = 0
+            stake_balance = round_to_smallest(result["stake"])
+            pending_stake_balance = 0
 
             for transaction in pending_transactions:
                 # Adjust the balance based on inputs
@@ -369,7 +354,7 @@ class WalletRepository:
                         input.get("address") == address
                         and input.get("tx_hash") in spendable_hashes
                     ):
-                        input_amount = Decimal(str(input.get("amount", "0")))
+                        input_amount = round_to_smallest(input.get("amount", 0))
                         if any(
                             tx_output.get("type") == "UN_STAKE"
                             for tx_output in transaction.get("outputs", [])
@@ -381,7 +366,7 @@ class WalletRepository:
                 # Adjust the balance based on outputs
                 for output in transaction.get("outputs", []):
                     if output.get("address") == address:
-                        output_amount = Decimal(str(output.get("amount", "0")))
+                        output_amount = round_to_smallest(output.get("amount", 0))
                         if output.get("type") == "STAKE":
                             pending_stake_balance += output_amount
                         elif output.get("type") == "UN_STAKE":
@@ -389,11 +374,10 @@ class WalletRepository:
                         elif output.get("type") == "REGULAR":
                             pending_balance += output_amount
 
-            # Format the total balance and pending balance to remove unnecessary trailing zeros
-            formatted_total_balance = round_up_decimal(total_balance)
-            formatted_pending_balance = round_up_decimal(pending_balance)
-            formatted_pending_stake_balance = round_up_decimal(pending_stake_balance)
-            formatted_stake_balance = round_up_decimal(stake_balance)
+            formatted_total_balance = from_smallest(total_balance)
+            formatted_pending_balance = from_smallest(pending_balance)
+            formatted_pending_stake_balance = from_smallest(pending_stake_balance)
+            formatted_stake_balance = from_smallest(stake_balance)
 
             balance_data = (
                 formatted_total_balance,
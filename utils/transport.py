@@ -0,0 +1,162 @@
+import asyncio
+import copy
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils import profiling
+
+
+class NodeTransport:
+    """
+    Pooled HTTP transport used to talk to the node.
+
+    All requests go through one keep-alive ``requests.Session`` and run on a
+    dedicated thread pool, so awaiting them never blocks the event loop. The
+    pool size bounds how many requests are in flight at once.
+    """
+
+    def __init__(
+        self, node_url: str, timeout: float = 10, max_concurrency: int = 64
+    ) -> None:
+        self.node_url = node_url.rstrip("/")
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=max_concurrency, pool_block=True
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="upow-http"
+        )
+
+    async def get(self, path: str, params: dict = None, timeout: float = None):
+        return await self.request("GET", path, params=params, timeout=timeout)
+
+    async def post(self, path: str, json: dict = None, timeout: float = None):
+        return await self.request("POST", path, json=json, timeout=timeout)
+
+    async def request(self, method: str, path: str, timeout: float = None, **kwargs):
+        """
+        Sends a request to the node and returns the decoded JSON body.
+
+        :raises: requests.RequestException, ValueError
+        """
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        response = await loop.run_in_executor(
+            self._executor,
+            partial(
+                self.session.request,
+                method,
+                f"{self.node_url}/{path.lstrip('/')}",
+                timeout=timeout if timeout is not None else self.timeout,
+                **kwargs,
+            ),
+        )
+        if profiling.active():
+            body = response.request.body or b""
+            profiling.record_request(
+                method,
+                path,
+                len(response.request.url) + len(body),
+                len(response.content),
+                time.perf_counter() - start,
+            )
+        response.raise_for_status()
+        return response.json()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+
+def _request_key(method: str, path: str, payload) -> str:
+    return json.dumps(
+        [method, path.lstrip("/"), payload or {}], sort_keys=True, default=str
+    )
+
+
+class RecordingTransport:
+    """
+    Wraps another transport and appends every response to a JSON lines
+    fixture file, which ``ReplayTransport`` can serve later without a node.
+    """
+
+    def __init__(self, transport, path: str) -> None:
+        self.transport = transport
+        self.path = path
+
+    async def get(self, path: str, params: dict = None, timeout: float = None):
+        return await self.request("GET", path, params=params, timeout=timeout)
+
+    async def post(self, path: str, json: dict = None, timeout: float = None):
+        return await self.request("POST", path, json=json, timeout=timeout)
+
+    async def request(self, method: str, path: str, timeout: float = None, **kwargs):
+        response = await self.transport.request(method, path, timeout, **kwargs)
+        payload = kwargs.get("params") if method == "GET" else kwargs.get("json")
+        with open(self.path, "a") as file:
+            file.write(
+                json.dumps(
+                    {
+                        "key": _request_key(method, path, payload),
+                        "response": response,
+                    }
+                )
+                + "\n"
+            )
+        return response
+
+    def close(self):
+        self.transport.close()
+
+
+class ReplayTransport:
+    """
+    Serves the responses of a ``RecordingTransport`` fixture file. Requests
+    recorded several times get their responses in the recorded order, the last
+    one is repeated once they run out.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.responses = {}
+        with open(path) as file:
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    self.responses.setdefault(record["key"], []).append(
+                        record["response"]
+                    )
+        self._positions = {}
+
+    async def get(self, path: str, params: dict = None, timeout: float = None):
+        return await self.request("GET", path, params=params, timeout=timeout)
+
+    async def post(self, path: str, json: dict = None, timeout: float = None):
+        return await self.request("POST", path, json=json, timeout=timeout)
+
+    async def request(self, method: str, path: str, timeout: float = None, **kwargs):
+        payload = kwargs.get("params") if method == "GET" else kwargs.get("json")
+        key = _request_key(method, path, payload)
+        responses = self.responses.get(key)
+        if not responses:
+            raise Exception(f"No recorded response for {method} {path} {payload}")
+        position = self._positions.get(key, 0)
+        self._positions[key] = position + 1
+        response = responses[min(position, len(responses) - 1)]
+        if profiling.active():
+            profiling.record_request(
+                method, path, len(key), len(json.dumps(response)), 0
+            )
+        return copy.deepcopy(response)
+
+    def close(self):
+        pass
@@ -1,28 +1,52 @@
-from decimal import Decimal
-
 from fastecdsa import keys
 
+from utils import profiling
+from utils.coin_selection import InsufficientInputsError, select_inputs
+from utils.mempool import Mempool
 from utils.repository import WalletRepository
-from upow_transactions.constants import CURVE, MAX_INODES
+from utils.transport import NodeTransport
+from utils.utxo_store import UTXOStore
+from upow_transactions.constants import (
+    CURVE,
+    MAX_BLOCK_SIZE_HEX,
+    MAX_INODES,
+    MAX_OUTPUTS,
+)
 from upow_transactions.helpers import (
     point_to_string,
+    to_smallest,
     OutputType,
     TransactionType,
 )
+from upow_transactions.signer import Signer
 from upow_transactions.transaction import Transaction
+from upow_transactions.transaction_input import TransactionInput
 from upow_transactions.transaction_output import TransactionOutput
 
 
 class Utils:
     NODE_URL = "https://api.upow.ai"
 
-    def __init__(self) -> None:
-        self.repo = WalletRepository(self.NODE_URL)
-
-    def get_balance_info(self, address: str):
-        result = self.repo.get_balance_info(address)
+    def __init__(
+        self,
+        transport: NodeTransport = None,
+        utxo_store: UTXOStore = None,
+        coin_selection: str = "fewest_inputs",
+        node_url: str = None,
+        mempool: Mempool = None,
+    ) -> None:
+        self.repo = WalletRepository(
+            node_url or self.NODE_URL, transport, utxo_store, mempool
+        )
+        self.coin_selection = coin_selection
+
+    async def get_balance_info(self, address: str):
+        result = await self.repo.get_balance_info(address)
         return result
 
+    async def push_tx(self, tx: Transaction):
+        return await self.repo.push_tx(tx.hex())
+
     async def create_transaction(
         self,
         private_key,
@@ -31,38 +55,39 @@ class Utils:
         message: bytes = None,
         send_back_address=None,
     ):
-        amount = Decimal(amount)
-        inputs = []
-        sender_address = point_to_string(keys.get_public_key(private_key, CURVE))
+        amount = to_smallest(amount)
+        public_key = self.derive_public_key(private_key)
+        sender_address = point_to_string(public_key)
         if send_back_address is None:
             send_back_address = sender_address
 
-        r_json = self.repo.get_address_info(sender_address)
-        address_inputs = self.repo.get_address_input_from_json(
+        r_json = await self.repo.get_address_info(sender_address)
+        utxo_table = self.repo.get_address_utxo_table_from_json(
             r_json, address=sender_address
         )
-        inputs.extend(address_inputs)
-        if not inputs:
+        if not utxo_table:
             raise Exception("No spendable outputs")
 
-        if sum(input.amount for input in inputs) < amount:
+        if utxo_table.total() < amount:
             raise Exception(f"Error: You don't have enough funds")
 
-        transaction_inputs = self.select_transaction_input(inputs, amount)
+        transaction_inputs = utxo_table.select(amount, self.coin_selection, public_key)
 
-        transaction_amount = sum(input.amount for input in transaction_inputs)
+        transaction_amount = sum(input.value for input in transaction_inputs)
 
         transaction = Transaction(
             transaction_inputs,
-            [TransactionOutput(receiving_address, amount=amount)],
+            [TransactionOutput.from_value(receiving_address, amount)],
             message,
         )
         if transaction_amount > amount:
             transaction.outputs.append(
-                TransactionOutput(send_back_address, transaction_amount - amount)
+                TransactionOutput.from_value(
+                    send_back_address, transaction_amount - amount
+                )
             )
 
-        transaction.sign([private_key])
+        self.sign_transaction(transaction, [private_key])
 
         return transaction
 
@@ -78,149 +103,279 @@ class Utils:
             raise Exception(
                 "Receiving addresses length is different from amounts length"
             )
-        amounts = [Decimal(amount) for amount in amounts]
+        amounts = [to_smallest(amount) for amount in amounts]
         total_amount = sum(amounts)
-        total_amount = Decimal(total_amount)
-        inputs = []
-        sender_address = point_to_string(keys.get_public_key(private_key, CURVE))
+        public_key = self.derive_public_key(private_key)
+        sender_address = point_to_string(public_key)
         if send_back_address is None:
             send_back_address = sender_address
 
-        r_json = self.repo.get_address_info(sender_address)
-        address_inputs = self.repo.get_address_input_from_json(
+        r_json = await self.repo.get_address_info(sender_address)
+        utxo_table = self.repo.get_address_utxo_table_from_json(
             r_json, address=sender_address
         )
-        inputs.extend(address_inputs)
 
-        if not inputs:
+        if not utxo_table:
             raise Exception("No spendable outputs")
 
-        total_input_amount = sum(input.amount for input in inputs)
-
-        if total_input_amount < total_amount:
+        if utxo_table.total() < total_amount:
             raise Exception(f"Error: You don't have enough funds")
 
-        transaction_inputs = []
         transaction_outputs = []
 
         # Select inputs to cover the total amount
-        input_amount = Decimal(0)
-        for tx_input in sorted(inputs, key=lambda item: item.amount, reverse=True):
-            transaction_inputs.append(tx_input)
-            input_amount += tx_input.amount
-            if input_amount >= total_amount:
-                break
+        transaction_inputs = utxo_table.select(
+            total_amount, "largest_first", public_key
+        )
+        input_amount = sum(input.value for input in transaction_inputs)
 
         # Create outputs for each receiving address
         for receiving_address, amount in zip(receiving_addresses, amounts):
             transaction_outputs.append(
-                TransactionOutput(receiving_address, amount=Decimal(amount))
+                TransactionOutput.from_value(receiving_address, amount)
             )
 
         # If there's change, add an output back to the sender
         change_amount = input_amount - total_amount
         if change_amount > 0:
             transaction_outputs.append(
-                TransactionOutput(send_back_address, amount=change_amount)
+                TransactionOutput.from_value(send_back_address, change_amount)
             )
 
         transaction = Transaction(transaction_inputs, transaction_outputs, message)
-        transaction.sign([private_key])
+        self.sign_transaction(transaction, [private_key])
 
         return transaction
 
+    async def create_batch_payout_transactions(
+        self,
+        private_key,
+        payouts,
+        message: bytes = None,
+        send_back_address=None,
+        allow_chained_change: bool = False,
+    ):
+        """
+        Packs ``payouts``, a list of ``(address, amount)`` pairs, into as few
+        transactions as the input, output and block size limits allow.
+
+        Change of a transaction is only spent by the following ones when
+        ``allow_chained_change`` is set.
+        """
+        payouts = [(address, to_smallest(amount)) for address, amount in payouts]
+        if not payouts:
+            raise Exception("No payouts")
+        public_key = self.derive_public_key(private_key)
+        sender_address = point_to_string(public_key)
+        if send_back_address is None:
+            send_back_address = sender_address
+        signer = Signer()
+        signer.add_key(private_key, public_key)
+
+        r_json = await self.repo.get_address_info(sender_address)
+        inputs = self.repo.get_address_input_from_json(r_json, address=sender_address)
+        if not inputs:
+            raise Exception("No spendable outputs")
+
+        if sum(input.value for input in inputs) < sum(amount for _, amount in payouts):
+            raise Exception(f"Error: You don't have enough funds")
+
+        transactions = []
+        try:
+            self._pack_payouts(
+                transactions,
+                inputs,
+                payouts,
+                message,
+                send_back_address,
+                sender_address,
+                public_key,
+                signer,
+                allow_chained_change,
+            )
+        except Exception:
+            # None of the transactions built so far will be pushed
+            for transaction in transactions:
+                self.repo.forget_transaction(transaction)
+            raise
+        return transactions
+
+    def _pack_payouts(
+        self,
+        transactions: list,
+        inputs,
+        payouts,
+        message: bytes,
+        send_back_address,
+        sender_address,
+        public_key,
+        signer: Signer,
+        allow_chained_change: bool,
+    ):
+        start = 0
+        while start < len(payouts):
+            if sum(input.value for input in inputs) < payouts[start][1]:
+                raise Exception(
+                    "Error: Not enough funds left for the remaining payouts. "
+                    "Allow chained change to spend the change of previous transactions"
+                )
+            # Leave room for the change output
+            batch_size = min(MAX_OUTPUTS - 1, len(payouts) - start)
+            while True:
+                try:
+                    transaction = self._create_payout_transaction(
+                        inputs,
+                        payouts[start : start + batch_size],
+                        message,
+                        send_back_address,
+                    )
+                except InsufficientInputsError:
+                    if batch_size == 1:
+                        raise
+                else:
+                    # Every input belongs to the sender, so one signature
+                    if transaction.signed_size(1) * 2 <= MAX_BLOCK_SIZE_HEX:
+                        break
+                    if batch_size == 1:
+                        raise Exception(
+                            "Error: A single payout does not fit in a block"
+                        )
+                batch_size //= 2
+            with profiling.stage("sign"):
+                transaction.sign(signer=signer)
+
+            self.repo.record_transaction(transaction)
+            transactions.append(transaction)
+            start += batch_size
+
+            spent_outputs = {
+                (tx_input.tx_hash, tx_input.index) for tx_input in transaction.inputs
+            }
+            inputs = [
+                tx_input
+                for tx_input in inputs
+                if (tx_input.tx_hash, tx_input.index) not in spent_outputs
+            ]
+            change_output = transaction.outputs[-1]
+            if (
+                allow_chained_change
+                and len(transaction.outputs) > batch_size
+                and change_output.address == sender_address
+            ):
+                inputs.append(
+                    TransactionInput(
+                        transaction.hash(),
+                        len(transaction.outputs) - 1,
+                        public_key=public_key,
+                        value=change_output.value,
+                    )
+                )
+
+    def _create_payout_transaction(
+        self, inputs, payouts, message: bytes, send_back_address
+    ):
+        amount = sum(amount for _, amount in payouts)
+        transaction_inputs = self.select_transaction_input(inputs, amount)
+        transaction_amount = sum(input.value for input in transaction_inputs)
+
+        transaction_outputs = [
+            TransactionOutput.from_value(address, amount) for address, amount in payouts
+        ]
+        if transaction_amount > amount:
+            transaction_outputs.append(
+                TransactionOutput.from_value(
+                    send_back_address, transaction_amount - amount
+                )
+            )
+        return Transaction(transaction_inputs, transaction_outputs, message)
+
     async def create_stake_transaction(
         self, private_key, amount, send_back_address=None
     ):
-        amount = Decimal(amount)
+        amount = to_smallest(amount)
         inputs = []
 
-        sender_address = point_to_string(keys.get_public_key(private_key, CURVE))
+        sender_address = point_to_string(self.derive_public_key(private_key))
         if send_back_address is None:
             send_back_address = sender_address
 
-        result_json = self.repo.get_address_info(
+        result_json = await self.repo.get_address_info(
             sender_address,
             stake_outputs=True,
             delegate_unspent_votes=True,
             delegate_spent_votes=True,
         )
+        address_state = self.repo.parse_address_info(result_json, sender_address)
         inputs.extend(
-            self.repo.get_address_input_from_json(result_json, address=sender_address)
+            self.repo.get_address_input_from_json(address_state, address=sender_address)
         )
 
         if not inputs:
             raise Exception("No spendable outputs")
 
-        if sum(input.amount for input in inputs) < amount:
+        if sum(input.value for input in inputs) < amount:
             raise Exception(f"Error: You don't have enough funds")
 
         stake_inputs = self.repo.get_stake_input_from_json(
-            result_json, address=sender_address, check_pending_txs=False
+            address_state, address=sender_address, check_pending_txs=False
         )
         if stake_inputs:
             raise Exception("Already staked")
 
-        transaction_inputs = []
-
-        for tx_input in sorted(inputs, key=lambda item: item.amount):
-            if tx_input.amount >= amount:
-                transaction_inputs.append(tx_input)
-                break
-        for tx_input in sorted(inputs, key=lambda item: item.amount, reverse=True):
-            if sum(input.amount for input in transaction_inputs) >= amount:
-                break
-            transaction_inputs.append(tx_input)
+        transaction_inputs = self.select_transaction_input(inputs, amount)
 
-        transaction_amount = sum(input.amount for input in transaction_inputs)
+        transaction_amount = sum(input.value for input in transaction_inputs)
 
         transaction = Transaction(
             transaction_inputs,
             [
-                TransactionOutput(
-                    sender_address, amount=amount, transaction_type=OutputType.STAKE
+                TransactionOutput.from_value(
+                    sender_address, amount, transaction_type=OutputType.STAKE
                 )
             ],
         )
 
         if transaction_amount > amount:
             transaction.outputs.append(
-                TransactionOutput(send_back_address, transaction_amount - amount)
+                TransactionOutput.from_value(
+                    send_back_address, transaction_amount - amount
+                )
             )
 
-        if not self.repo.get_delegates_all_power(result_json):
-            voting_power = Decimal(10)
+        if not self.repo.get_delegates_all_power(address_state):
+            voting_power = to_smallest(10)
             transaction.outputs.append(
-                TransactionOutput(
+                TransactionOutput.from_value(
                     sender_address,
                     voting_power,
                     transaction_type=OutputType.DELEGATE_VOTING_POWER,
                 )
             )
 
-        transaction.sign([private_key])
+        self.sign_transaction(transaction, [private_key])
 
         return transaction
 
     async def create_unstake_transaction(self, private_key):
-        sender_address = point_to_string(keys.get_public_key(private_key, CURVE))
-        result_json = self.repo.get_address_info(
+        sender_address = point_to_string(self.derive_public_key(private_key))
+        result_json = await self.repo.get_address_info(
             sender_address, stake_outputs=True, delegate_spent_votes=True
         )
+        address_state = self.repo.parse_address_info(result_json, sender_address)
         stake_inputs = self.repo.get_stake_input_from_json(
-            result_json, address=sender_address
+            address_state, address=sender_address
         )
         if not stake_inputs:
             raise Exception(f"Error: There is nothing staked")
-        amount = stake_inputs[0].amount
+        amount = stake_inputs[0].value
 
         if self.repo.get_delegate_spent_votes_from_json(
-            result_json, check_pending_txs=False
+            address_state, check_pending_txs=False
         ):
             raise Exception("Kindly release the votes.")
 
         pending_vote_tx = self.repo.get_pending_vote_as_delegate_transaction_from_json(
-            sender_address, result_json
+            sender_address, address_state
         )
         if pending_vote_tx:
             raise Exception("Kindly release the votes. Vote transaction is in pending")
@@ -228,138 +383,136 @@ class Utils:
         transaction = Transaction(
             [stake_inputs[0]],
             [
-                TransactionOutput(
-                    sender_address, amount=amount, transaction_type=OutputType.UN_STAKE
+                TransactionOutput.from_value(
+                    sender_address, amount, transaction_type=OutputType.UN_STAKE
                 )
             ],
         )
-        transaction.sign([private_key])
+        self.sign_transaction(transaction, [private_key])
         return transaction
 
     async def create_inode_registration_transaction(self, private_key):
-        amount = Decimal(1000)
+        amount = to_smallest(1000)
         inputs = []
-        address = point_to_string(keys.get_public_key(private_key, CURVE))
+        address = point_to_string(self.derive_public_key(private_key))
 
-        result_json = self.repo.get_address_info(
+        result_json = await self.repo.get_address_info(
             address, stake_outputs=True, address_state=True
         )
+        address_state = self.repo.parse_address_info(result_json, address)
         inputs.extend(
-            self.repo.get_address_input_from_json(result_json, address=address)
+            self.repo.get_address_input_from_json(address_state, address=address)
         )
 
         if not inputs:
             raise Exception("No spendable outputs")
 
-        if sum(input.amount for input in inputs) < amount:
+        if sum(input.value for input in inputs) < amount:
             raise Exception(f"Error: You don't have enough funds")
 
-        stake_inputs = self.repo.get_stake_input_from_json(result_json, address=address)
+        stake_inputs = self.repo.get_stake_input_from_json(
+            address_state, address=address
+        )
         if not stake_inputs:
             raise Exception(f"You are not a delegate. Become a delegate by staking.")
 
-        is_inode_registered = result_json["is_inode"]
+        is_inode_registered = address_state.is_inode
         if is_inode_registered:
             raise Exception(f"This address is already registered as inode.")
 
-        is_validator_registered = result_json["is_validator"]
+        is_validator_registered = address_state.is_validator
         if is_validator_registered:
             raise Exception(
                 f"This address is registered as validator and a validator cannot be an inode."
             )
 
-        inode_addresses = self.repo.get_dobby_info()
+        inode_addresses = await self.repo.get_dobby_info()
         if len(inode_addresses) >= MAX_INODES:
             raise Exception(f"{MAX_INODES} inodes are already registered.")
 
-        transaction_inputs = []
-
-        for tx_input in sorted(inputs, key=lambda item: item.amount):
-            if tx_input.amount >= amount:
-                transaction_inputs.append(tx_input)
-                break
-        for tx_input in sorted(inputs, key=lambda item: item.amount, reverse=True):
-            if sum(input.amount for input in transaction_inputs) >= amount:
-                break
-            transaction_inputs.append(tx_input)
+        transaction_inputs = self.select_transaction_input(inputs, amount)
 
-        transaction_amount = sum(input.amount for input in transaction_inputs)
+        transaction_amount = sum(input.value for input in transaction_inputs)
 
         transaction = Transaction(
             transaction_inputs,
             [
-                TransactionOutput(
+                TransactionOutput.from_value(
                     address,
-                    amount=amount,
+                    amount,
                     transaction_type=OutputType.INODE_REGISTRATION,
                 )
             ],
         )
         if transaction_amount > amount:
             transaction.outputs.append(
-                TransactionOutput(address, transaction_amount - amount)
+                TransactionOutput.from_value(address, transaction_amount - amount)
             )
 
-        transaction.sign([private_key])
+        self.sign_transaction(transaction, [private_key])
         return transaction
 
     async def create_inode_de_registration_transaction(self, private_key):
         inputs = []
-        address = point_to_string(keys.get_public_key(private_key, CURVE))
+        address = point_to_string(self.derive_public_key(private_key))
 
-        result_json = self.repo.get_address_info(
+        result_json = await self.repo.get_address_info(
             address, inode_registration_outputs=True
         )
+        address_state = self.repo.parse_address_info(result_json, address)
         inputs.extend(
             self.repo.get_inode_registration_input_from_json(
-                result_json, address=address
+                address_state, address=address
             )
         )
 
         if not inputs:
             raise Exception("This address is not registered as an inode.")
 
-        active_inode_addresses = self.repo.get_dobby_info()
+        active_inode_addresses = await self.repo.get_dobby_info()
         is_inode_active = any(
             entry.get("wallet") == address for entry in active_inode_addresses
         )
         if is_inode_active:
             raise Exception("This address is an active inode. Cannot de-register.")
 
-        amount = inputs[0].amount
+        amount = inputs[0].value
         message = self.string_to_bytes(str(TransactionType.INODE_DE_REGISTRATION.value))
         transaction = Transaction(
-            inputs, [TransactionOutput(address, amount=amount)], message
+            inputs, [TransactionOutput.from_value(address, amount)], message
         )
-        transaction.sign([private_key])
+        self.sign_transaction(transaction, [private_key])
         return transaction
 
     async def create_validator_registration_transaction(self, private_key):
-        amount = Decimal(100)
+        amount = to_smallest(100)
         inputs = []
-        address = point_to_string(keys.get_public_key(private_key, CURVE))
-        result_json = self.repo.get_address_info(
+        address = point_to_string(self.derive_public_key(private_key))
+        result_json = await self.repo.get_address_info(
             address, stake_outputs=True, address_state=True
         )
+        address_state = self.repo.parse_address_info(result_json, address)
         inputs.extend(
-            self.repo.get_address_input_from_json(result_json, address=address)
+            self.repo.get_address_input_from_json(address_state, address=address)
         )
 
         if not inputs:
             raise Exception("No spendable outputs")
 
-        if sum(input.amount for input in inputs) < amount:
+        if sum(input.value for input in inputs) < amount:
             raise Exception(f"Error: You don't have enough funds")
 
-        stake_inputs = self.repo.get_stake_input_from_json(result_json, address=address)
+        stake_inputs = self.repo.get_stake_input_from_json(
+            address_state, address=address
+        )
         if not stake_inputs:
             raise Exception(f"You are not a delegate. Become a delegate by staking.")
 
-        is_validator_registered = result_json["is_validator"]
+        is_validator_registered = address_state.is_validator
         if is_validator_registered:
             raise Exception(f"This address is already registered as validator.")
 
-        is_inode_registered = result_json["is_inode"]
+        is_inode_registered = address_state.is_inode
         if is_inode_registered:
             raise Exception(
                 f"This address is registered as inode and an inode cannot be a validator."
@@ -367,7 +520,7 @@ class Utils:
 
         transaction_inputs = self.select_transaction_input(inputs, amount)
 
-        transaction_amount = sum(input.amount for input in transaction_inputs)
+        transaction_amount = sum(input.value for input in transaction_inputs)
 
         message = self.string_to_bytes(
             str(TransactionType.VALIDATOR_REGISTRATION.value)
@@ -375,18 +528,18 @@ class Utils:
         transaction = Transaction(
             transaction_inputs,
             [
-                TransactionOutput(
+                TransactionOutput.from_value(
                     address,
-                    amount=amount,
+                    amount,
                     transaction_type=OutputType.VALIDATOR_REGISTRATION,
                 )
             ],
             message,
         )
 
-        voting_power = Decimal(10)
+        voting_power = to_smallest(10)
         transaction.outputs.append(
-            TransactionOutput(
+            TransactionOutput.from_value(
                 address,
                 voting_power,
                 transaction_type=OutputType.VALIDATOR_VOTING_POWER,
@@ -395,10 +548,10 @@ class Utils:
 
         if transaction_amount > amount:
             transaction.outputs.append(
-                TransactionOutput(address, transaction_amount - amount)
+                TransactionOutput.from_value(address, transaction_amount - amount)
             )
 
-        transaction.sign([private_key])
+        self.sign_transaction(transaction, [private_key])
         return transaction
 
     async def create_voting_transaction(
@@ -413,60 +566,63 @@ class Utils:
         if vote_range <= 0:
             raise Exception("Invalid voting range")
 
-        address = point_to_string(keys.get_public_key(private_key, CURVE))
-        result_json = self.repo.get_address_info(
+        address = point_to_string(self.derive_public_key(private_key))
+        result_json = await self.repo.get_address_info(
             address,
             stake_outputs=True,
             address_state=True,
             validator_unspent_votes=True,
             delegate_unspent_votes=True,
         )
-        stake_inputs = self.repo.get_stake_input_from_json(result_json, address=address)
+        address_state = self.repo.parse_address_info(result_json, address)
+        stake_inputs = self.repo.get_stake_input_from_json(
+            address_state, address=address
+        )
 
-        is_inode_registered = result_json["is_inode"]
+        is_inode_registered = address_state.is_inode
         if is_inode_registered:
             raise Exception(f"This address is registered as inode. Cannot vote.")
 
-        is_validator_registered = result_json["is_validator"]
+        is_validator_registered = address_state.is_validator
         if is_validator_registered:
             return await self.vote_as_validator(
-                private_key, vote_range, vote_receiving_address, result_json
+                private_key, vote_range, vote_receiving_address, address_state
             )
         elif stake_inputs:
             return await self.vote_as_delegate(
-                private_key, vote_range, vote_receiving_address, result_json
+                private_key, vote_range, vote_receiving_address, address_state
             )
         else:
             raise Exception("Not eligible to vote")
 
     async def vote_as_validator(
-        self, private_key, vote_range, vote_receiving_address, result_json
+        self, private_key, vote_range, vote_receiving_address, address_state
     ):
-        address = point_to_string(keys.get_public_key(private_key, CURVE))
-        vote_range = Decimal(vote_range)
+        address = point_to_string(self.derive_public_key(private_key))
+        vote_range = to_smallest(vote_range)
         inputs = []
         inputs.extend(
-            self.repo.get_validator_unspent_votes_from_json(result_json, address)
+            self.repo.get_validator_unspent_votes_from_json(address_state, address)
         )
         if not inputs:
             raise Exception("No voting outputs")
 
-        if sum(input.amount for input in inputs) < vote_range:
+        if sum(input.value for input in inputs) < vote_range:
             raise Exception(
                 f"Error: You don't have enough voting power left. Kindly revoke some voting power."
             )
 
         transaction_inputs = self.select_transaction_input(inputs, vote_range)
 
-        transaction_vote_range = sum(input.amount for input in transaction_inputs)
+        transaction_vote_range = sum(input.value for input in transaction_inputs)
 
         message = self.string_to_bytes(str(TransactionType.VOTE_AS_VALIDATOR.value))
         transaction = Transaction(
             transaction_inputs,
             [
-                TransactionOutput(
+                TransactionOutput.from_value(
                     vote_receiving_address,
-                    amount=vote_range,
+                    vote_range,
                     transaction_type=OutputType.VOTE_AS_VALIDATOR,
                 )
             ],
@@ -474,45 +630,45 @@ class Utils:
         )
         if transaction_vote_range > vote_range:
             transaction.outputs.append(
-                TransactionOutput(
+                TransactionOutput.from_value(
                     address,
                     transaction_vote_range - vote_range,
                     transaction_type=OutputType.VALIDATOR_VOTING_POWER,
                 )
             )
 
-        transaction.sign([private_key])
+        self.sign_transaction(transaction, [private_key])
         return transaction
 
     async def vote_as_delegate(
-        self, private_key, vote_range, vote_receiving_address, result_json
+        self, private_key, vote_range, vote_receiving_address, address_state
     ):
-        address = point_to_string(keys.get_public_key(private_key, CURVE))
+        address = point_to_string(self.derive_public_key(private_key))
 
-        vote_range = Decimal(vote_range)
+        vote_range = to_smallest(vote_range)
         inputs = []
         inputs.extend(
-            self.repo.get_delegate_unspent_votes_from_json(result_json, address)
+            self.repo.get_delegate_unspent_votes_from_json(address_state, address)
         )
         if not inputs:
             raise Exception("No voting outputs")
 
-        if sum(input.amount for input in inputs) < vote_range:
+        if sum(input.value for input in inputs) < vote_range:
             raise Exception(
                 f"Error: You don't have enough voting power left. Kindly release some voting power."
             )
 
         transaction_inputs = self.select_transaction_input(inputs, vote_range)
 
-        transaction_vote_range = sum(input.amount for input in transaction_inputs)
+        transaction_vote_range = sum(input.value for input in transaction_inputs)
 
         message = self.string_to_bytes(str(TransactionType.VOTE_AS_DELEGATE.value))
         transaction = Transaction(
             transaction_inputs,
             [
-                TransactionOutput(
+                TransactionOutput.from_value(
                     vote_receiving_address,
-                    amount=vote_range,
+                    vote_range,
                     transaction_type=OutputType.VOTE_AS_DELEGATE,
                 )
             ],
@@ -520,79 +676,82 @@ class Utils:
         )
         if transaction_vote_range > vote_range:
             transaction.outputs.append(
-                TransactionOutput(
+                TransactionOutput.from_value(
                     address,
                     transaction_vote_range - vote_range,
                     transaction_type=OutputType.DELEGATE_VOTING_POWER,
                 )
             )
 
-        transaction.sign([private_key])
+        self.sign_transaction(transaction, [private_key])
         return transaction
 
     async def create_revoke_transaction(self, private_key, revoke_from_address):
-        address = point_to_string(keys.get_public_key(private_key, CURVE))
-        result_json = self.repo.get_address_info(
+        address = point_to_string(self.derive_public_key(private_key))
+        result_json = await self.repo.get_address_info(
             address, stake_outputs=True, address_state=True
         )
+        address_state = self.repo.parse_address_info(result_json, address)
 
-        stake_inputs = self.repo.get_stake_input_from_json(result_json, address=address)
+        stake_inputs = self.repo.get_stake_input_from_json(
+            address_state, address=address
+        )
 
-        is_validator_registered = result_json["is_validator"]
+        is_validator_registered = address_state.is_validator
         if is_validator_registered:
             return await self.revoke_vote_as_validator(
-                private_key, revoke_from_address, result_json
+                private_key, revoke_from_address, address_state
             )
         elif stake_inputs:
             pass
             return await self.revoke_vote_as_delegate(
-                private_key, revoke_from_address, result_json
+                private_key, revoke_from_address, address_state
             )
         else:
             raise Exception("Not eligible to revoke")
 
     async def revoke_vote_as_validator(self, private_key, inode_address, address_info):
-        address = point_to_string(keys.get_public_key(private_key, CURVE))
-        inode_ballot = self.repo.get_validators_info(inode_address)
+        address = point_to_string(self.derive_public_key(private_key))
+        inode_ballot = await self.repo.get_validators_info(inode_address)
         inode_ballot_inputs = self.repo.get_inode_ballot_input_by_address_from_json(
             inode_ballot,
             address,
             inode_address,
-            pending_spent_outputs=address_info["pending_spent_outputs"],
+            pending_spent_outputs=address_info.result["pending_spent_outputs"],
         )
         if not inode_ballot_inputs:
             raise Exception("You have not voted.")
 
         message = self.string_to_bytes(str(TransactionType.REVOKE_AS_VALIDATOR.value))
         sum_of_votes = sum(
-            inode_ballot_input.amount for inode_ballot_input in inode_ballot_inputs
+            inode_ballot_input.value for inode_ballot_input in inode_ballot_inputs
         )
         transaction = Transaction(
             inode_ballot_inputs,
             [
-                TransactionOutput(
+                TransactionOutput.from_value(
                     address,
-                    amount=sum_of_votes,
+                    sum_of_votes,
                     transaction_type=OutputType.VALIDATOR_VOTING_POWER,
                 )
             ],
             message,
         )
-        transaction.sign([private_key])
+        self.sign_transaction(transaction, [private_key])
         return transaction
 
     async def revoke_vote_as_delegate(
         self, private_key, validator_address, address_info
     ):
-        address = point_to_string(keys.get_public_key(private_key, CURVE))
+        address = point_to_string(self.derive_public_key(private_key))
 
-        validator_ballot = self.repo.get_delegates_info(validator_address)
+        validator_ballot = await self.repo.get_delegates_info(validator_address)
         validator_ballot_inputs = (
             self.repo.get_validator_ballot_input_by_address_from_json(
                 validator_ballot,
                 address,
                 validator_address,
-                pending_spent_outputs=address_info["pending_spent_outputs"],
+                pending_spent_outputs=address_info.result["pending_spent_outputs"],
             )
         )
 
@@ -601,34 +760,37 @@ class Utils:
 
         message = self.string_to_bytes(str(TransactionType.REVOKE_AS_DELEGATE.value))
         sum_of_votes = sum(
-            validator_ballot_input.amount
+            validator_ballot_input.value
             for validator_ballot_input in validator_ballot_inputs
         )
         transaction = Transaction(
             validator_ballot_inputs,
             [
-                TransactionOutput(
+                TransactionOutput.from_value(
                     address,
-                    amount=sum_of_votes,
+                    sum_of_votes,
                     transaction_type=OutputType.DELEGATE_VOTING_POWER,
                 )
             ],
             message,
         )
-        transaction.sign([private_key])
+        self.sign_transaction(transaction, [private_key])
+        return transaction
+
+    def derive_public_key(self, private_key: int):
+        with profiling.stage("derive_key"):
+            return keys.get_public_key(private_key, CURVE)
+
+    def sign_transaction(
+        self, transaction: Transaction, private_keys: list, signer: Signer = None
+    ):
+        with profiling.stage("sign"):
+            transaction.sign(private_keys, signer)
+        self.repo.record_transaction(transaction)
         return transaction
 
-    def select_transaction_input(self, inputs, amount):
-        transaction_inputs = []
-        for tx_input in sorted(inputs, key=lambda item: item.amount):
-            if tx_input.amount >= amount:
-                transaction_inputs.append(tx_input)
-                break
-        for tx_input in sorted(inputs, key=lambda item: item.amount, reverse=True):
-            if sum(input.amount for input in transaction_inputs) >= amount:
-                break
-            transaction_inputs.append(tx_input)
-        return transaction_inputs
+    def select_transaction_input(self, inputs, amount, strategy: str = None):
+        return select_inputs(inputs, amount, strategy or self.coin_selection)
 
     def string_to_bytes(self, string: str) -> bytes:
         if string is None:
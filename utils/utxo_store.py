@@ -0,0 +1,220 @@
+import json
+import sqlite3
+import time
+
+# Output lists returned by get_address_info, keyed by the request flag that
+# asks the node for them. Spendable outputs are always returned.
+OUTPUT_CATEGORIES = {
+    "spendable_outputs": None,
+    "stake_outputs": "stake_outputs",
+    "inode_registration_outputs": "inode_registration_outputs",
+    "delegate_spent_votes": "delegate_spent_votes",
+    "delegate_unspent_votes": "delegate_unspent_votes",
+    "validator_unspent_votes": "validator_unspent_votes",
+}
+BASE_FIELD = "spendable_outputs"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outputs (
+    address TEXT NOT NULL,
+    category TEXT NOT NULL,
+    tx_hash TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    spent_at REAL,
+    PRIMARY KEY (address, category, tx_hash, idx)
+);
+CREATE INDEX IF NOT EXISTS outputs_outpoint ON outputs (tx_hash, idx);
+CREATE TABLE IF NOT EXISTS address_state (
+    address TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fetched (
+    address TEXT NOT NULL,
+    field TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (address, field)
+);
+"""
+
+
+class UTXOStore:
+    """
+    On-disk cache of the ``get_address_info`` results of our addresses.
+
+    Outputs are stored per address and ``(tx_hash, index)``, so a refresh only
+    writes the rows that changed. Outputs spent by a transaction we signed are
+    marked locally and reported as pending spent until the node drops them.
+    The mark is cleared when the node does not accept the transaction, when a
+    refresh ``spent_grace`` seconds after the spend shows the node does not
+    list it as pending, or after ``spent_ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_age: float = 30,
+        spent_ttl: float = 600,
+        spent_grace: float = 30,
+    ):
+        self.path = path
+        self.max_age = max_age
+        self.spent_ttl = spent_ttl
+        self.spent_grace = spent_grace
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def get(self, address: str, fields: list):
+        """
+        Returns the cached address info if every requested field was fetched
+        less than ``max_age`` seconds ago, otherwise None.
+        """
+        fields = {BASE_FIELD, *fields}
+        fetched = dict(
+            self.connection.execute(
+                "SELECT field, fetched_at FROM fetched WHERE address = ?", (address,)
+            ).fetchall()
+        )
+        oldest = time.time() - self.max_age
+        if any(fetched.get(field, 0) < oldest for field in fields):
+            return None
+
+        row = self.connection.execute(
+            "SELECT state FROM address_state WHERE address = ?", (address,)
+        ).fetchone()
+        if row is None:
+            return None
+        result = json.loads(row[0])
+        for category in OUTPUT_CATEGORIES:
+            result[category] = []
+        for category, data in self.connection.execute(
+            "SELECT category, data FROM outputs WHERE address = ?", (address,)
+        ):
+            result[category].append(json.loads(data))
+        return self._add_local_spends(address, result)
+
+    def refresh(self, address: str, fields: list, result: dict):
+        """
+        Stores a fresh node result for ``fields`` and returns it with the
+        locally spent outputs added to ``pending_spent_outputs``.
+        """
+        now = time.time()
+        categories = [
+            category
+            for category, field in OUTPUT_CATEGORIES.items()
+            if field is None or field in fields
+        ]
+        with self.connection:
+            for category in categories:
+                self._refresh_category(address, category, result.get(category) or [])
+            self.connection.execute(
+                "UPDATE outputs SET spent_at = NULL WHERE address = ? AND spent_at < ?",
+                (address, now - self.spent_ttl),
+            )
+            # Spends the node still does not list after the grace period never
+            # reached it
+            node_pending = {
+                (output["tx_hash"], output["index"])
+                for output in result.get("pending_spent_outputs") or []
+            }
+            self.connection.executemany(
+                "UPDATE outputs SET spent_at = NULL WHERE address = ? AND tx_hash = ? AND idx = ?",
+                [
+                    (address, tx_hash, index)
+                    for tx_hash, index in self.connection.execute(
+                        "SELECT tx_hash, idx FROM outputs WHERE address = ? AND spent_at < ?",
+                        (address, now - self.spent_grace),
+                    ).fetchall()
+                    if (tx_hash, index) not in node_pending
+                ],
+            )
+
+            row = self.connection.execute(
+                "SELECT state FROM address_state WHERE address = ?", (address,)
+            ).fetchone()
+            state = json.loads(row[0]) if row else {}
+            state.update(
+                (key, value)
+                for key, value in result.items()
+                if key not in OUTPUT_CATEGORIES
+            )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO address_state (address, state) VALUES (?, ?)",
+                (address, json.dumps(state)),
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO fetched (address, field, fetched_at) VALUES (?, ?, ?)",
+                [(address, field, now) for field in {BASE_FIELD, *fields}],
+            )
+        return self._add_local_spends(address, result)
+
+    def mark_spent(self, tx_inputs):
+        """
+        Marks the outputs spent by ``tx_inputs`` so they are not selected again
+        before the node reports the spending transaction as pending.
+        """
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE outputs SET spent_at = ? WHERE tx_hash = ? AND idx = ?",
+                [
+                    (time.time(), tx_input.tx_hash, tx_input.index)
+                    for tx_input in tx_inputs
+                ],
+            )
+
+    def unmark_spent(self, tx_inputs):
+        """
+        Clears the marks of ``mark_spent`` for a transaction the node did not
+        accept.
+        """
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE outputs SET spent_at = NULL WHERE tx_hash = ? AND idx = ?",
+                [(tx_input.tx_hash, tx_input.index) for tx_input in tx_inputs],
+            )
+
+    def close(self):
+        self.connection.close()
+
+    def _refresh_category(self, address: str, category: str, outputs: list):
+        existing = set(
+            self.connection.execute(
+                "SELECT tx_hash, idx FROM outputs WHERE address = ? AND category = ?",
+                (address, category),
+            ).fetchall()
+        )
+        incoming = {(output["tx_hash"], output["index"]): output for output in outputs}
+        self.connection.executemany(
+            "DELETE FROM outputs WHERE address = ? AND category = ? AND tx_hash = ? AND idx = ?",
+            [
+                (address, category, tx_hash, index)
+                for tx_hash, index in existing - incoming.keys()
+            ],
+        )
+        self.connection.executemany(
+            "INSERT INTO outputs (address, category, tx_hash, idx, data) VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    address,
+                    category,
+                    tx_hash,
+                    index,
+                    json.dumps(incoming[tx_hash, index]),
+                )
+                for tx_hash, index in incoming.keys() - existing
+            ],
+        )
+
+    def _add_local_spends(self, address: str, result: dict):
+        pending_spent_outputs = list(result.get("pending_spent_outputs") or [])
+        pending = {
+            (output["tx_hash"], output["index"]) for output in pending_spent_outputs
+        }
+        for tx_hash, index in self.connection.execute(
+            "SELECT DISTINCT tx_hash, idx FROM outputs WHERE address = ? AND spent_at >= ?",
+            (address, time.time() - self.spent_ttl),
+        ):
+            if (tx_hash, index) not in pending:
+                pending_spent_outputs.append({"tx_hash": tx_hash, "index": index})
+        result["pending_spent_outputs"] = pending_spent_outputs
+        return result
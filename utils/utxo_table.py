@@ -0,0 +1,102 @@
+from array import array
+from typing import NamedTuple
+
+from upow_transactions.constants import MAX_INPUTS
+from upow_transactions.helpers import round_to_smallest
+from upow_transactions.transaction_input import TransactionInput
+from utils.coin_selection import select_inputs
+
+
+class UTXORow(NamedTuple):
+    position: int
+    value: int
+
+
+class UTXOTable:
+    """
+    Column-wise table of unspent outputs.
+
+    Transaction hashes are packed into one bytearray, and indexes and amounts,
+    in the smallest unit, into arrays, which takes a fraction of the memory of
+    a list of ``TransactionInput``. Inputs are only built for the rows picked
+    for spending.
+    """
+
+    __slots__ = ("tx_hashes", "indexes", "amounts")
+
+    def __init__(self):
+        self.tx_hashes = bytearray()
+        self.indexes = array("B")
+        self.amounts = array("Q")
+
+    @classmethod
+    def from_outputs(cls, outputs, exclude=None):
+        """
+        Builds a table from the outputs of a ``get_address_info`` result,
+        leaving out the ``(tx_hash, index)`` pairs in ``exclude``.
+        """
+        table = cls()
+        for output in outputs:
+            if exclude and (output["tx_hash"], output["index"]) in exclude:
+                continue
+            table.append(
+                output["tx_hash"], output["index"], round_to_smallest(output["amount"])
+            )
+        return table
+
+    def __len__(self):
+        return len(self.indexes)
+
+    def append(self, tx_hash: str, index: int, amount: int):
+        self.tx_hashes += bytes.fromhex(tx_hash)
+        self.indexes.append(index)
+        self.amounts.append(amount)
+
+    def tx_hash(self, position: int) -> str:
+        return self.tx_hashes[position * 32 : position * 32 + 32].hex()
+
+    def total(self) -> int:
+        return sum(self.amounts)
+
+    def remove(self, spent_outputs):
+        """
+        Drops the rows whose ``(tx_hash, index)`` is in ``spent_outputs``.
+        """
+        kept = [
+            position
+            for position in range(len(self))
+            if (self.tx_hash(position), self.indexes[position]) not in spent_outputs
+        ]
+        if len(kept) == len(self):
+            return
+        self.tx_hashes = bytearray().join(
+            self.tx_hashes[position * 32 : position * 32 + 32] for position in kept
+        )
+        self.indexes = array("B", (self.indexes[position] for position in kept))
+        self.amounts = array("Q", (self.amounts[position] for position in kept))
+
+    def to_input(self, position: int, public_key=None) -> TransactionInput:
+        return TransactionInput(
+            self.tx_hash(position),
+            self.indexes[position],
+            public_key=public_key,
+            value=self.amounts[position],
+        )
+
+    def to_inputs(self, public_key=None):
+        return [self.to_input(position, public_key) for position in range(len(self))]
+
+    def select(
+        self,
+        amount: int,
+        strategy: str = "fewest_inputs",
+        public_key=None,
+        max_inputs: int = MAX_INPUTS,
+    ):
+        """
+        Runs coin selection for ``amount``, in the smallest unit, over the
+        table's rows and returns the picked ones as ``TransactionInput``.
+        """
+        rows = [UTXORow(position, value) for position, value in enumerate(self.amounts)]
+        selected = select_inputs(rows, amount, strategy, max_inputs)
+        return [self.to_input(row.position, public_key) for row in selected]
@@ -1,23 +1,110 @@
+from __future__ import annotations
+
 import argparse
 import asyncio
+import json
 import logging
 import os
 import sys
+import time
+from contextlib import aclosing
+from typing import TYPE_CHECKING
 
-import pickledb
-import requests
-from fastecdsa import keys, curve
+from utils import profiling
 
-from upow_transactions.constants import CURVE
-from upow_transactions.helpers import point_to_string, sha256
-from utils.utils import Utils
+if TYPE_CHECKING:
+    from utils.keystore import KeyStore
+    from utils.push_pipeline import PushPipeline
+    from utils.utils import Utils
 
 dir_path = os.path.dirname(os.path.realpath(__file__))
 sys.path.insert(0, dir_path + "/../..")
 
+# Commands that parse their own options, such as the payout options, again
+# with a parser of their own
+OWN_PARSER_COMMANDS = {
+    "send",
+    "payout",
+    "daemon",
+    "batch",
+    "stake",
+    "unstake",
+    "register_inode",
+    "de_register_inode",
+    "register_validator",
+    "vote",
+    "revoke",
+}
+
 
 async def main():
-    parser = argparse.ArgumentParser(description="UPOW wallet")
+    common_parser = argparse.ArgumentParser(add_help=False)
+    common_parser.add_argument(
+        "--utxo-max-age",
+        metavar="seconds",
+        type=float,
+        dest="utxo_max_age",
+        default=30,
+        help="reuse cached outputs fetched less than this many seconds ago",
+    )
+    common_parser.add_argument(
+        "--max-chain-depth",
+        metavar="depth",
+        type=int,
+        dest="max_chain_depth",
+        default=25,
+        help="longest chain of unconfirmed transactions whose change is spent",
+    )
+    common_parser.add_argument(
+        "--coin-selection",
+        metavar="strategy",
+        type=str,
+        dest="coin_selection",
+        default="fewest_inputs",
+        help="how inputs are chosen: fewest_inputs, largest_first or branch_and_bound",
+    )
+    common_parser.add_argument(
+        "--node",
+        metavar="url",
+        type=str,
+        dest="node",
+        help="node the wallet talks to (default https://api.upow.ai)",
+    )
+    common_parser.add_argument(
+        "--record",
+        metavar="fixture",
+        type=str,
+        dest="record",
+        help="append the node responses to this fixture file",
+    )
+    common_parser.add_argument(
+        "--replay",
+        metavar="fixture",
+        type=str,
+        dest="replay",
+        help="answer node requests from a recorded fixture file instead of the node",
+    )
+    common_parser.add_argument(
+        "--profile",
+        metavar="report",
+        type=str,
+        dest="profile",
+        help="time each stage and count node requests, and write a JSON report "
+        "to this file or directory",
+    )
+    common_parser.add_argument(
+        "--profile-cpu",
+        action="store_true",
+        dest="profile_cpu",
+        help="add cProfile statistics to the profile report",
+    )
+    common_parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        dest="profile_memory",
+        help="add tracemalloc statistics to the profile report",
+    )
+    parser = argparse.ArgumentParser(description="UPOW wallet", parents=[common_parser])
     parser.add_argument(
         "command",
         metavar="command",
@@ -34,6 +121,9 @@ async def main():
             "register_validator",
             "vote",
             "revoke",
+            "payout",
+            "daemon",
+            "batch",
         ],
     )
     parser.add_argument("-to", metavar="recipient", type=str, required=False)
@@ -45,48 +135,148 @@ async def main():
     parser.add_argument(
         "-from", metavar="revoke_from", type=str, dest="revoke_from", required=False
     )
+    parser.add_argument(
+        "-p",
+        metavar="parallelism",
+        type=int,
+        dest="parallelism",
+        default=32,
+        help="max number of concurrent balance lookups",
+    )
+    parser.add_argument(
+        "-n",
+        metavar="count",
+        type=int,
+        dest="count",
+        default=1,
+        help="number of keys to generate with createwallet",
+    )
+    parser.add_argument(
+        "-o",
+        metavar="output",
+        type=str,
+        dest="output",
+        help="file the generated addresses are appended to",
+    )
+    parser.add_argument(
+        "--total-only",
+        action="store_true",
+        dest="total_only",
+        help="only print the aggregated balance",
+    )
+
+    # Options of a single command are checked by that command's own parser
+    args, extra_args = parser.parse_known_args()
+    if extra_args and args.command not in OWN_PARSER_COMMANDS:
+        parser.error(f"unrecognized arguments: {' '.join(extra_args)}")
+    logging.basicConfig(
+        level=logging.INFO if "--nologs" not in sys.argv else logging.WARNING
+    )
 
-    args = parser.parse_args()
-    db = pickledb.load(f"{dir_path}/key_pair_list.json", True)
-    wallet_utils: Utils = Utils()
+    # Modules are only imported once the command is known, so --help and
+    # mistyped commands return right away and each command loads what it uses
+    from utils.keystore import KeyStore
+
+    keystore = KeyStore(f"{dir_path}/keystore.db")
+    keystore.import_legacy(f"{dir_path}/key_pair_list.json")
+    wallet_utils = None
+    if args.command != "createwallet":
+        wallet_utils = create_wallet_utils(args, parser)
+
+    profiler = None
+    if args.profile:
+        profiler = profiling.Profiler(args.profile_cpu, args.profile_memory)
+        profiling.enable(profiler)
+        profiler.start()
+    try:
+        with profiling.stage(f"command:{args.command}"):
+            await run_command(args, common_parser, keystore, wallet_utils)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            profiling.disable()
+            write_profile(profiler, args.profile, args.command)
+
+
+def create_wallet_utils(args, parser: argparse.ArgumentParser) -> Utils:
+    from utils.coin_selection import STRATEGIES
+    from utils.mempool import Mempool
+    from utils.transport import NodeTransport, RecordingTransport, ReplayTransport
+    from utils.utils import Utils
+    from utils.utxo_store import UTXOStore
+
+    if args.coin_selection not in STRATEGIES:
+        parser.error(
+            f"argument --coin-selection: invalid choice: '{args.coin_selection}' "
+            f"(choose from {', '.join(STRATEGIES)})"
+        )
+    utxo_store = UTXOStore(f"{dir_path}/utxo_cache.db", max_age=args.utxo_max_age)
+    mempool = Mempool(f"{dir_path}/utxo_cache.db", max_depth=args.max_chain_depth)
+    if args.replay:
+        transport = ReplayTransport(args.replay)
+    else:
+        transport = NodeTransport(args.node or Utils.NODE_URL)
+    if args.record:
+        transport = RecordingTransport(transport, args.record)
+    return Utils(
+        transport=transport,
+        utxo_store=utxo_store,
+        coin_selection=args.coin_selection,
+        node_url=args.node,
+        mempool=mempool,
+    )
 
+
+async def run_command(args, common_parser, keystore: KeyStore, wallet_utils: Utils):
     command = args.command
 
     if command == "createwallet":
-        key_list = db.get("keys") or []
-        private_key = keys.gen_private_key(CURVE)
-        public_key = keys.get_public_key(private_key, curve.P256)
-        address = point_to_string(public_key)
-        key_list.append({"private_key": private_key, "public_key": address})
-        db.set("keys", key_list)
-
-        print(f"Private key: {hex(private_key)}\nAddress: {address}")
-    elif command == "balance":
-        key_pair_list = db.get("keys") or []
-        total_balance = 0
-        total_pending_balance = 0
-        for key_pair in key_pair_list:
-            public_key = keys.get_public_key(key_pair["private_key"], curve.P256)
-            address = point_to_string(public_key)
+        from fastecdsa import keys
 
-            balance, pending_balance, stake, pending_stake, is_error = (
-                wallet_utils.get_balance_info(address)
-            )
-            if is_error:
-                break
-            total_balance += balance
-            total_pending_balance += pending_balance
+        from upow_transactions.constants import CURVE
+        from utils.keystore import generate_key_records
 
+        if args.count == 1 and args.output is None:
+            key_pair = keystore.add_key(keys.gen_private_key(CURVE))
             print(
-                f'\nAddress: {address}\nPrivate key: {hex(key_pair["private_key"])}'
-                f'\nBalance: {balance}{f" ({pending_balance} pending)" if pending_balance != 0 else ""}'
-                f'\nStake: {stake}{f" ({pending_stake} pending)" if pending_stake != 0 else ""}'
+                f"Private key: {hex(key_pair.private_key)}\nAddress: {key_pair.address}"
             )
+        else:
+            records = generate_key_records(args.count)
+            keystore.add_records(records)
+            output = open(args.output, "a") if args.output else sys.stdout
+            try:
+                for _, address, _, _ in records:
+                    output.write(f"{address}\n")
+            finally:
+                if output is not sys.stdout:
+                    output.close()
+    elif command == "balance":
+        key_pair_list = keystore.iter_keys()
+        total_balance = 0
+        total_pending_balance = 0
+        async with aclosing(
+            iter_balances(wallet_utils, key_pair_list, args.parallelism)
+        ) as balances:
+            async for key_pair, address, balance_info in balances:
+                balance, pending_balance, stake, pending_stake, is_error = balance_info
+                if is_error:
+                    break
+                total_balance += balance
+                total_pending_balance += pending_balance
+
+                if args.total_only:
+                    continue
+                print(
+                    f"\nAddress: {address}\nPrivate key: {hex(key_pair.private_key)}"
+                    f'\nBalance: {balance}{f" ({pending_balance} pending)" if pending_balance != 0 else ""}'
+                    f'\nStake: {stake}{f" ({pending_stake} pending)" if pending_stake != 0 else ""}'
+                )
         print(
             f'\nTotal Balance: {total_balance}{f" ({total_pending_balance} pending)" if total_pending_balance != 0 else ""}'
         )
     elif command == "send":
-        parser = argparse.ArgumentParser()
+        parser = argparse.ArgumentParser(parents=[common_parser])
         parser.add_argument(
             "command", metavar="command", type=str, help="action to do with the wallet"
         )
@@ -106,22 +296,189 @@ async def main():
         message = args.message
 
         if len(recipients) > 1 and len(amounts) > 1 and len(recipients) == len(amounts):
-            selected_private_key = await select_key(db)
+            selected_private_key = await select_key(keystore)
             tx = await wallet_utils.create_transaction_to_send_multiple_wallet(
                 selected_private_key, recipients, amounts, string_to_bytes(message)
             )
         else:
             receiver = recipients[0]
             amount = amounts[0]
-            selected_private_key = await select_key(db)
+            selected_private_key = await select_key(keystore)
             tx = await wallet_utils.create_transaction(
                 selected_private_key, receiver, amount, string_to_bytes(message)
             )
 
         await push_tx(tx, wallet_utils)
 
+    elif command == "payout":
+        parser = argparse.ArgumentParser(parents=[common_parser])
+        parser.add_argument(
+            "command", metavar="command", type=str, help="action to do with the wallet"
+        )
+        parser.add_argument(
+            "-f",
+            metavar="payouts_file",
+            type=str,
+            dest="payouts_file",
+            required=True,
+            help="file with one 'address,amount' pair per line",
+        )
+        parser.add_argument(
+            "-m", metavar="message", type=str, dest="message", required=False
+        )
+        parser.add_argument(
+            "--allow-chained-change",
+            action="store_true",
+            dest="allow_chained_change",
+            help="let a transaction spend the change of the previous one",
+        )
+        parser.add_argument(
+            "--max-in-flight",
+            metavar="count",
+            type=int,
+            dest="max_in_flight",
+            default=8,
+            help="max number of transactions pushed at once",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            metavar="count",
+            type=int,
+            dest="max_attempts",
+            default=5,
+            help="attempts per transaction on connection errors, 429 and 5xx",
+        )
+        parser.add_argument(
+            "--push-rate",
+            metavar="per_second",
+            type=float,
+            dest="push_rate",
+            help="max number of pushes started per second",
+        )
+        parser.add_argument(
+            "--results",
+            metavar="results_file",
+            type=str,
+            dest="results",
+            help="file the push result of every transaction is written to",
+        )
+
+        args = parser.parse_args()
+        payouts = read_payouts(args.payouts_file)
+
+        selected_private_key = await select_key(keystore)
+        transactions = await wallet_utils.create_batch_payout_transactions(
+            selected_private_key,
+            payouts,
+            string_to_bytes(args.message),
+            allow_chained_change=args.allow_chained_change,
+        )
+        print(f"{len(payouts)} payouts packed in {len(transactions)} transactions")
+        from utils.push_pipeline import PushPipeline
+
+        pipeline = PushPipeline(
+            wallet_utils.repo,
+            # Chained transactions must reach the node in order
+            max_in_flight=1 if args.allow_chained_change else args.max_in_flight,
+            max_attempts=args.max_attempts,
+            rate=args.push_rate,
+        )
+        await push_transactions(pipeline, transactions, args.results)
+
+    elif command == "daemon":
+        parser = argparse.ArgumentParser(parents=[common_parser])
+        parser.add_argument(
+            "command", metavar="command", type=str, help="action to do with the wallet"
+        )
+        parser.add_argument(
+            "--socket",
+            metavar="path",
+            type=str,
+            dest="socket",
+            default=f"{dir_path}/wallet.sock",
+            help="unix socket the JSON-RPC API listens on",
+        )
+        parser.add_argument(
+            "--port",
+            metavar="port",
+            type=int,
+            dest="port",
+            help="listen on this port of 127.0.0.1 instead of a unix socket",
+        )
+        parser.add_argument(
+            "--token-file",
+            metavar="path",
+            type=str,
+            dest="token_file",
+            default=f"{dir_path}/wallet.token",
+            help="file with the token requests on --port must carry, created "
+            "when missing",
+        )
+
+        args = parser.parse_args()
+        from utils.daemon import WalletDaemon, load_token
+
+        daemon = WalletDaemon(wallet_utils, keystore)
+        if args.port is not None:
+            await daemon.serve_tcp(args.port, load_token(args.token_file))
+        else:
+            await daemon.serve_unix(args.socket)
+
+    elif command == "batch":
+        parser = argparse.ArgumentParser(parents=[common_parser])
+        parser.add_argument(
+            "command", metavar="command", type=str, help="action to do with the wallet"
+        )
+        parser.add_argument(
+            "-f",
+            metavar="commands_file",
+            type=str,
+            dest="commands_file",
+            required=True,
+            help="file with one JSON command per line",
+        )
+        parser.add_argument(
+            "-o",
+            metavar="results_file",
+            type=str,
+            dest="output",
+            help="file the result of every command is written to",
+        )
+        parser.add_argument(
+            "-p",
+            metavar="parallelism",
+            type=int,
+            dest="parallelism",
+            default=8,
+            help="max number of commands run at once",
+        )
+
+        args = parser.parse_args()
+        from utils.batch import run_batch
+        from utils.daemon import WalletDaemon
+
+        daemon = WalletDaemon(wallet_utils, keystore)
+        succeeded = failed = 0
+        output = open(args.output, "w") if args.output else sys.stdout
+        try:
+            with open(args.commands_file) as commands:
+                async with aclosing(
+                    run_batch(daemon, commands, max(args.parallelism, 1))
+                ) as results:
+                    async for result in results:
+                        if result["ok"]:
+                            succeeded += 1
+                        else:
+                            failed += 1
+                        output.write(json.dumps(result, default=str) + "\n")
+                        output.flush()
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        print(f"{succeeded} commands succeeded, {failed} failed", file=sys.stderr)
+
     elif command == "stake":
-        parser = argparse.ArgumentParser()
+        parser = argparse.ArgumentParser(parents=[common_parser])
         parser.add_argument(
             "command", metavar="command", type=str, help="action to do with the wallet"
         )
@@ -132,58 +489,63 @@ async def main():
         args = parser.parse_args()
         amount = args.amount
 
-        selected_private_key = await select_key(db)
+        selected_private_key = await select_key(keystore)
 
         tx = await wallet_utils.create_stake_transaction(selected_private_key, amount)
         await push_tx(tx, wallet_utils)
 
     elif command == "unstake":
-        parser = argparse.ArgumentParser()
+        parser = argparse.ArgumentParser(parents=[common_parser])
         parser.add_argument(
             "command", metavar="command", type=str, help="action to do with the wallet"
         )
+        parser.parse_args()
 
-        selected_private_key = await select_key(db)
+        selected_private_key = await select_key(keystore)
         tx = await wallet_utils.create_unstake_transaction(selected_private_key)
         await push_tx(tx, wallet_utils)
 
     elif command == "register_inode":
-        parser = argparse.ArgumentParser()
+        parser = argparse.ArgumentParser(parents=[common_parser])
         parser.add_argument(
             "command", metavar="command", type=str, help="action to do with the wallet"
         )
+        parser.parse_args()
 
-        selected_private_key = await select_key(db)
+        selected_private_key = await select_key(keystore)
         tx = await wallet_utils.create_inode_registration_transaction(
             selected_private_key
         )
         await push_tx(tx, wallet_utils)
 
     elif command == "de_register_inode":
-        parser = argparse.ArgumentParser()
+        parser = argparse.ArgumentParser(parents=[common_parser])
         parser.add_argument(
             "command", metavar="command", type=str, help="action to do with the wallet"
         )
-        selected_private_key = await select_key(db)
+        parser.parse_args()
+
+        selected_private_key = await select_key(keystore)
         tx = await wallet_utils.create_inode_de_registration_transaction(
             selected_private_key
         )
         await push_tx(tx, wallet_utils)
 
     elif command == "register_validator":
-        parser = argparse.ArgumentParser()
+        parser = argparse.ArgumentParser(parents=[common_parser])
         parser.add_argument(
             "command", metavar="command", type=str, help="action to do with the wallet"
         )
+        parser.parse_args()
 
-        selected_private_key = await select_key(db)
+        selected_private_key = await select_key(keystore)
         tx = await wallet_utils.create_validator_registration_transaction(
             selected_private_key
         )
         await push_tx(tx, wallet_utils)
 
     elif command == "vote":
-        parser = argparse.ArgumentParser()
+        parser = argparse.ArgumentParser(parents=[common_parser])
         parser.add_argument(
             "command", metavar="command", type=str, help="action to do with the wallet"
         )
@@ -197,14 +559,14 @@ async def main():
         voting_range = args.range
         recipient = args.recipient
 
-        selected_private_key = await select_key(db)
+        selected_private_key = await select_key(keystore)
         tx = await wallet_utils.create_voting_transaction(
             selected_private_key, voting_range, recipient
         )
         await push_tx(tx, wallet_utils)
 
     elif command == "revoke":
-        parser = argparse.ArgumentParser()
+        parser = argparse.ArgumentParser(parents=[common_parser])
         parser.add_argument(
             "command", metavar="command", type=str, help="action to do with the wallet"
         )
@@ -213,56 +575,172 @@ async def main():
         )
         args = parser.parse_args()
         revoke_from = args.revoke_from
-        selected_private_key = await select_key(db)
+        selected_private_key = await select_key(keystore)
         tx = await wallet_utils.create_revoke_transaction(
             selected_private_key, revoke_from
         )
         await push_tx(tx, wallet_utils)
 
 
+async def iter_balances(wallet_utils: Utils, key_pair_list, parallelism: int):
+    """
+    Looks up the balance of every key with ``parallelism`` workers pulling
+    keys from ``key_pair_list``, and yields ``(key_pair, address,
+    balance_info)`` as each lookup completes. Keys are only read from the
+    iterator when a worker is free, and the workers are cancelled if the
+    caller stops early.
+    """
+    parallelism = max(parallelism, 1)
+    key_pairs = iter(key_pair_list)
+    results = asyncio.Queue(maxsize=parallelism)
+
+    async def worker():
+        for key_pair in key_pairs:
+            balance_info = await wallet_utils.get_balance_info(key_pair.address)
+            await results.put((key_pair, key_pair.address, balance_info))
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(parallelism)]
+    try:
+        while True:
+            for task in workers:
+                if task.done():
+                    # Raises the error of a failed worker
+                    task.result()
+            running = [task for task in workers if not task.done()]
+            if not running:
+                while not results.empty():
+                    yield results.get_nowait()
+                return
+            result = asyncio.ensure_future(results.get())
+            await asyncio.wait({result, *running}, return_when=asyncio.FIRST_COMPLETED)
+            if result.done():
+                yield result.result()
+            else:
+                result.cancel()
+    finally:
+        for task in workers:
+            task.cancel()
+
+
 async def push_tx(tx, wallet_utils: Utils):
     try:
-        r = requests.post(
-            f"{wallet_utils.NODE_URL}/push_tx", json={"tx_hex": tx.hex()}, timeout=10
-        )
-        r.raise_for_status()
-        res = r.json()
+        res = await wallet_utils.push_tx(tx)
         if res["ok"]:
-            print(f"Transaction pushed. Transaction hash: {sha256(tx.hex())}")
+            print(f"Transaction pushed. Transaction hash: {tx.hash()}")
         else:
             logging.error("\nTransaction has not been pushed")
     except Exception as e:
         logging.error(f"Error during request to node: {e}")
 
 
+async def push_transactions(pipeline: PushPipeline, transactions, results_path=None):
+    """
+    Pushes ``transactions`` through ``pipeline``, printing each outcome as it
+    comes and writing them as JSON lines to ``results_path`` when given.
+    """
+    results_file = open(results_path, "w") if results_path else None
+    pushed = failed = 0
+    try:
+        async with aclosing(pipeline.run(transactions)) as results:
+            async for result in results:
+                if result.ok:
+                    pushed += 1
+                    print(f"Transaction pushed. Transaction hash: {result.tx_hash}")
+                else:
+                    failed += 1
+                    logging.error(
+                        f"Transaction {result.tx_hash} has not been pushed after "
+                        f"{result.attempts} attempt(s): {result.error}"
+                    )
+                if results_file is not None:
+                    results_file.write(json.dumps(result.as_dict()) + "\n")
+                    results_file.flush()
+    finally:
+        if results_file is not None:
+            results_file.close()
+    print(f"{pushed} transactions pushed, {failed} failed")
+
+
 async def push_tx_request(tx):
+    import requests
+
     r = requests.get("https://upow.network/push_tx", {"tx_hex": tx.hex()}, timeout=10)
     res = r.json()
     if res["ok"]:
-        print(f"Transaction pushed. Transaction hash: {sha256(tx.hex())}")
+        print(f"Transaction pushed. Transaction hash: {tx.hash()}")
     else:
         logging.error("\nTransaction has not been added")
 
 
-async def select_key(db):
-    selected_private_key = None
-    if db.get("keys") is False:
+def write_profile(profiler: profiling.Profiler, path: str, command: str):
+    """
+    Writes the profile report to ``path``, or to a new file named after the
+    command and time when ``path`` is a directory.
+    """
+    if os.path.isdir(path):
+        path = os.path.join(
+            path, f"profile-{command}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        )
+    profiler.write(path, command=command)
+    logging.info(f"Profile report written to {path}")
+
+
+async def select_key(keystore: KeyStore, page_size: int = 20):
+    # Includes the time the user takes to pick a key
+    with profiling.stage("select_key"):
+        return await _select_key(keystore, page_size)
+
+
+async def _select_key(keystore: KeyStore, page_size: int):
+    keys_count = keystore.count()
+    if keys_count == 0:
         raise Exception("No key. please create key")
 
-    if len(db.get("keys")) > 1:
-        print("Keys: ", end="\n")
-        for i, key_pair in enumerate(db.get("keys")):
-            print(i, key_pair["public_key"], end="\n")
-        try:
-            user_input = int(input("Select key: "))
-            if user_input >= len(db.get("keys")):
+    if keys_count == 1:
+        return keystore.get_by_index(0).private_key
+
+    print("Keys: ", end="\n")
+    offset = 0
+    while True:
+        for i, key_pair in enumerate(keystore.page(offset, page_size), offset):
+            print(i, key_pair.address, end="\n")
+        offset += page_size
+        has_more = offset < keys_count
+        user_input = input(
+            "Select key (number or address, press enter for more): "
+            if has_more
+            else "Select key: "
+        ).strip()
+        if not user_input and has_more:
+            continue
+        if user_input.isdigit():
+            key_pair = keystore.get_by_index(int(user_input))
+            if key_pair is None:
                 raise Exception("Invalid input. Please enter a correct key number.")
-            selected_private_key = db.get("keys")[user_input]["private_key"]
-        except ValueError:
-            raise Exception("Invalid input. Please enter a valid integer.")
-    else:
-        selected_private_key = db.get("keys")[0]["private_key"]
-    return selected_private_key
+        else:
+            key_pair = keystore.get_by_address(user_input)
+            if key_pair is None:
+                raise Exception(
+                    "Invalid input. Please enter a valid integer or address."
+                )
+        return key_pair.private_key
+
+
+def read_payouts(path: str):
+    payouts = []
+    with open(path) as file:
+        for line_number, line in enumerate(file, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                address, amount = (value.strip() for value in line.split(","))
+            except ValueError:
+                raise Exception(
+                    f"Invalid payout on line {line_number}. Expected 'address,amount'"
+                )
+            payouts.append((address, amount))
+    return payouts
 
 
 def string_to_bytes(string: str) -> bytes: